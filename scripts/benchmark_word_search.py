@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+import random
+
+# Allow running as "python scripts/benchmark_word_search.py" from the project folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.game_logic.word_search import WordSearch, RIGHT, DOWN, DOWN_RIGHT, ALL_DIRECTIONS
+
+CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*"
+WORDS = ["SECURE", "ACCESS", "SYSTEM", "DEFEND", "SHIELD", "MALWARE", "FIREWALL", "PHISHING",
+         "PATCH", "CIPHER", "TOKEN", "BACKUP"]
+RUNS = 20
+
+# Harder grids than the minigame's: grid size, how many words are hidden and the directions they may read in
+TIERS = {
+    "classic": {"size": 8, "words": 1, "directions": [RIGHT, DOWN, DOWN_RIGHT]},
+    "hard": {"size": 12, "words": 3, "directions": ALL_DIRECTIONS},
+    "expert": {"size": 24, "words": 6, "directions": ALL_DIRECTIONS},
+    "insane": {"size": 64, "words": 12, "directions": ALL_DIRECTIONS},
+}
+
+def time_grid(rng, size, hidden, directions):
+    words = rng.sample(WORDS, hidden)
+    start = time.perf_counter()
+    WordSearch(size, words, CHARS, directions, forbidden=WORDS, rng=rng)
+    return (time.perf_counter() - start) * 1000
+
+def benchmark():
+    rng = random.Random(1)
+    print(f"{'size':>6} {'words':>6} {'mean ms':>9} {'worst ms':>9}")
+    for size in (8, 12, 16, 24, 32, 48, 64):
+        hidden = max(1, min(len(WORDS), size // 5))
+        times = [time_grid(rng, size, hidden, ALL_DIRECTIONS) for _ in range(RUNS)]
+        print(f"{size:>6} {hidden:>6} {sum(times) / RUNS:>9.2f} {max(times):>9.2f}")
+    print()
+    print(f"{'tier':>8} {'size':>6} {'words':>6} {'mean ms':>9} {'worst ms':>9}")
+    for name, tier in TIERS.items():
+        times = [time_grid(rng, tier["size"], tier["words"], tier["directions"]) for _ in range(RUNS)]
+        print(f"{name:>8} {tier['size']:>6} {tier['words']:>6} {sum(times) / RUNS:>9.2f} {max(times):>9.2f}")
+
+benchmark()
@@ -1,69 +1,154 @@
 import pygame
+import numpy as np
+from scripts.game_logic.collision import grid_first_entry
 
 class BarricadeManager:
     def __init__(self, game):
         self.game = game
-        self.barricades = []
         self.block_width = 15
         self.block_height = 10
         self.cols = 10
         self.rows = 4
+        # Hits a block takes before it goes, and its colour at each health left
+        self.block_health = 3
+        self.colors = {3: (0, 255, 0), 2: (160, 220, 0), 1: (230, 120, 0)}
+        # Top-left corner of each barricade, centred a third and two thirds of the way across the screen
+        barricade_width = self.cols * self.block_width
+        barricade_y = self.game.screen_height - 120
+        self.origins = [
+            (self.game.screen_width // 3 - barricade_width // 2, barricade_y),
+            (2 * self.game.screen_width // 3 - barricade_width // 2, barricade_y)
+        ]
+        # health[barricade, row, col] is the hits that block can still take, 0 once it is gone
+        self.health = None
+        # All the barricades are drawn from one cached surface covering bounds(), None until it is rendered
+        self.surface = None
         self.create_barricades()
 
     def create_barricades(self, saved_state=None):
-        self.barricades = []  # Clear any old barricades
-        barricade_y = self.game.screen_height - 120
-        barricade_width = self.cols * self.block_width
-        positions = [
-            self.game.screen_width // 3 - barricade_width // 2,
-            2 * self.game.screen_width // 3 - barricade_width // 2
-        ]
-    
-        for x, saved_blocks in zip(positions, saved_state) if saved_state else [(x, None) for x in positions]:
-            blocks = []
-            if saved_blocks:  # Restoring from save
-                for block in saved_blocks:
-                    block_rect = pygame.Rect(block["x"], block["y"], self.block_width, self.block_height)
-                    blocks.append({"rect": block_rect})
-            else:  # Creating new barricades
-                for row in range(self.rows):
-                    for col in range(self.cols):
-                        block_rect = pygame.Rect(
-                            x + col * self.block_width,
-                            barricade_y + row * self.block_height,
-                            self.block_width,
-                            self.block_height
-                        )
-                        blocks.append({"rect": block_rect})
-            self.barricades.append(blocks)
+        self.use_barricades(self.build_barricades(saved_state))
+
+    def use_barricades(self, health, surface=None):
+        self.health = health
+        self.surface = surface
+
+    def build_barricades(self, saved_state=None):
+        """New block grids, fresh or restored from a save, without touching the current ones."""
+        health = np.full((len(self.origins), self.rows, self.cols), self.block_health, dtype=np.uint8)
+        if saved_state:
+            for index, saved in enumerate(saved_state[:len(self.origins)]):
+                health[index] = self.load_grid(index, saved)
+        return health
+
+    def load_grid(self, index, saved):
+        grid = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        flat = grid.reshape(-1)
+        if isinstance(saved, dict):
+            # Bit planes, bit row * cols + col of plane k is bit k of that block's health
+            for plane, bits in enumerate(saved["health"]):
+                flat |= np.array([(bits >> bit) & 1 for bit in range(flat.size)], dtype=np.uint8) << plane
+        else:
+            # Older saves list the position of every block still standing
+            x, y = self.origins[index]
+            for block in saved:
+                grid[(block["y"] - y) // self.block_height, (block["x"] - x) // self.block_width] = self.block_health
+        return grid
+
+    def save_state(self):
+        """One {"health": [bit planes]} entry per barricade, see load_grid()."""
+        planes = range(int(self.block_health).bit_length())
+        return [{"health": [sum(1 << bit for bit in np.flatnonzero((grid >> plane) & 1).tolist()) for plane in planes]}
+                for grid in self.health]
+
+    def bounds(self):
+        """(left, top, right, bottom) of the area covered by all the barricades."""
+        xs = [x for x, _ in self.origins]
+        ys = [y for _, y in self.origins]
+        return (min(xs), min(ys),
+                max(xs) + self.cols * self.block_width, max(ys) + self.rows * self.block_height)
+
+    def find_enemy_bullet_hits(self, usable):
+        """(enemy bullet rows, flat block indices) for the usable enemy bullets whose centre is in a block."""
+        bullet_manager = self.game.bullet_manager
+        enemy_bullets = bullet_manager.enemy_bullets
+        half_width = bullet_manager.bullet_width / 2
+        half_height = bullet_manager.enemy_bullet_height / 2
+        # Only bullets inside the area covered by the barricades need the per-block test
+        left, top, right, bottom = self.bounds()
+        rows = enemy_bullets.in_rect(left - half_width - 1, top - half_height - 1,
+                                     right - half_width, bottom - half_height)
+        rows = rows[usable[rows]]
+        if not rows.size:
+            return rows, rows
+        # Each bullet's centre maps straight to one cell of every barricade
+        origins = np.array(self.origins, dtype=np.float64)
+        block_col = np.floor((enemy_bullets.x[rows, None] + half_width - origins[:, 0]) / self.block_width)
+        block_row = np.floor((enemy_bullets.y[rows, None] + half_height - origins[:, 1]) / self.block_height)
+        block_col = block_col.astype(np.intp)
+        block_row = block_row.astype(np.intp)
+        inside = (block_row >= 0) & (block_row < self.rows) & (block_col >= 0) & (block_col < self.cols)
+        barricade = np.arange(len(self.origins))
+        standing = inside & (self.health[barricade, np.clip(block_row, 0, self.rows - 1),
+                                         np.clip(block_col, 0, self.cols - 1)] > 0)
+        # Barricades don't overlap, so a bullet is in at most one block
+        hit = np.flatnonzero(standing.any(axis=1))
+        which = standing[hit].argmax(axis=1)
+        blocks = (which * self.rows + block_row[hit, which]) * self.cols + block_col[hit, which]
+        return rows[hit], blocks
+
+    def find_player_bullet_hits(self, rows):
+        """The player bullet rows whose path this frame crosses a block, player bullets don't damage blocks."""
+        if not rows.size:
+            return rows
+        bullet_manager = self.game.bullet_manager
+        # Player bullets are tested along their whole path so fast Laser bullets can't skip a block
+        rows = bullet_manager.player_bullets_hitting(*self.bounds(), rows)
+        if not rows.size:
+            return rows
+        x0, y0, x1, y1 = bullet_manager.swept_segments(rows)
+        hit = np.zeros(rows.size, dtype=bool)
+        for (x, y), grid in zip(self.origins, self.health):
+            _, blocks = grid_first_entry(x0, y0, x1, y1, grid > 0, x, y, self.block_width, self.block_height,
+                                         self.block_width, self.block_height)
+            hit |= blocks >= 0
+        return rows[hit]
+
+    def damage_blocks(self, blocks):
+        """Take one hit off a block per flat index (barricade, row, col), a block can be listed several times."""
+        flat = self.health.reshape(-1)
+        blocks, hits = np.unique(np.asarray(blocks, dtype=np.intp), return_counts=True)
+        flat[blocks] -= np.minimum(flat[blocks], hits).astype(np.uint8)
+        if self.surface is None:
+            return
+        # Only the damaged blocks are repainted in the cached surface
+        left, top = self.bounds()[:2]
+        for block, health in zip(blocks.tolist(), flat[blocks].tolist()):
+            self.paint_block(self.surface, block, health, left, top)
+
+    def block_rect(self, block):
+        barricade, cell = divmod(block, self.rows * self.cols)
+        row, col = divmod(cell, self.cols)
+        x, y = self.origins[barricade]
+        return x + col * self.block_width, y + row * self.block_height, self.block_width, self.block_height
 
-    def update(self):
-        for bullet in self.game.bullet_manager.enemy_bullets[:]:
-            bullet_pos = (
-                bullet[0] + self.game.bullet_manager.bullet_width / 2,
-                bullet[1] + self.game.bullet_manager.enemy_bullet_height / 2
-            )
-            for barricade in self.barricades:
-                for block in barricade:
-                    if block["rect"].collidepoint(bullet_pos):
-                        barricade.remove(block)  # Enemy bullets remove the block
-                        if bullet in self.game.bullet_manager.enemy_bullets:
-                            self.game.bullet_manager.enemy_bullets.remove(bullet)
-                        break
+    def paint_block(self, surface, block, health, left, top):
+        x, y, width, height = self.block_rect(block)
+        surface.fill(self.colors.get(health, (0, 0, 0, 0)), (x - left, y - top, width, height))
 
-        for bullet in self.game.bullet_manager.player_bullets[:]:
-            bullet_pos = (bullet[0], bullet[1])
-            for barricade in self.barricades:
-                for block in barricade:
-                    if block["rect"].collidepoint(bullet_pos):
-                        if bullet in self.game.bullet_manager.player_bullets:
-                            self.game.bullet_manager.player_bullets.remove(bullet)
-                        break
+    def render_barricades(self, health=None):
+        """A surface of the area covered by bounds() with every standing block painted in."""
+        health = self.health if health is None else health
+        left, top, right, bottom = self.bounds()
+        surface = pygame.Surface((right - left, bottom - top), pygame.SRCALPHA)
+        flat = health.reshape(-1)
+        for block in np.flatnonzero(flat).tolist():
+            self.paint_block(surface, block, int(flat[block]), left, top)
+        return surface
 
     def draw(self):
-        for barricade in self.barricades:
-            for block in barricade:
-                pygame.draw.rect(self.game.screen, (0, 255, 0), block["rect"])  # Always green
+        if self.surface is None:
+            self.surface = self.render_barricades()
+        self.game.screen.blit(self.surface, self.bounds()[:2])
 
     def reset(self):
         self.create_barricades()
@@ -3,6 +3,9 @@ import math
 import random
 import time
 import os
+import numpy as np
+from scripts.game_logic.collision import segments_cross_solid
+from scripts.game_logic.boss_patterns import PHASE_PATTERNS, VIRUS_BURST
 from scripts.game_logic.minigame import HackingMiniGame
 
 class Boss:
@@ -15,7 +18,14 @@ class Boss:
         # Load the virus bullet asset
         self.virus_bullet_image = self.load_and_scale_image("virus.png", (20, 20))
 
-        self.current_image = self.base_image
+        # Every animation frame (normal or rage, facing either way) is flipped once here, together with
+        # the [x, y] grid of its solid pixels that hits are tested against
+        self.frames = {}
+        for rage, image in ((False, self.base_image), (True, self.rage_image)):
+            for flipped in (False, True):
+                frame = pygame.transform.flip(image, True, False) if flipped else image
+                self.frames[rage, flipped] = (frame, pygame.surfarray.array_alpha(frame) > 127)
+        self.current_image, self.current_solid = self.frames[False, False]
         self.width, self.height = self.base_image.get_size()
         self.x = (game.screen_width - self.width) // 2
         self.y = 100
@@ -31,34 +41,41 @@ class Boss:
         self.initial_x = self.x
         self.initial_y = self.y
         self.initial_speed = self.speed
-        self.initial_shoot_interval = 0.1
         self.initial_animation_interval = self.animation_interval
 
         self.rage_mode = False
+        # Rage mode and difficulty scale the phase's movement speed and fire rate, nothing else changes
+        self.rage_speed = 1.5
+        self.rage_fire_rate = 2
+        self.fire_rate = 1.0
         self.name = "VIRUS"
         self.minigame_triggered = False
 
         # For movement that needs a stored horizontal velocity
         self.dx = self.speed
 
-        # For erratic (phase 5) movement: target position and time
+        # Movement runs on the boss's own clock, counted in frames, so it is the same however long frames take
+        self.clock = 0
+        self.bake_paths()
+
+        # For erratic (phase 5) movement: target position and clock frame it was picked on
         self.target_pos = (self.x, self.y)
-        self.last_target_update = pygame.time.get_ticks()
+        self.last_target_update = 0
 
         # New attributes for the multi–phase AI:
-        self.phase = 1  # Phases 1 to 5
-        # Adjustable shooting intervals (in seconds) for each phase:
-        self.phase1_shoot_interval = 0.15  # Phase 1: Line attack (100%-81%)
-        self.phase2_shoot_interval = 0.1  # Phase 2: Spread attack (80%-61%)
-        self.phase3_shoot_interval = 0.5  # Phase 3: Aimed attack (60%-41%)
-        self.phase4_shoot_interval = 0.07  # Phase 4: Circle attack (40%-21%)
-        self.phase5_shoot_interval = 1 # Phase 5: Virus explosion attack (20%-0%)
-        
+        self.phase = 1  # Phases 1 to 5, each with its attack in boss_patterns.PHASE_PATTERNS
+        self.phase_speeds = {1: 6, 2: 3, 3: 5, 4: 3, 5: 3}
+        # (time, pattern) of the volleys still to come from patterns that fire several
+        self.pending_volleys = []
+
         # Variables for Virus Bullets
         self.virus_bullet_speed = 4
         self.min_explosion_dist = 300
         self.max_explosion_dist = 700
         self.player_explode_threshold = 250
+        self.virus_explode_y = 500  # Viruses that get this low explode whatever their distance
+        # An explosion always sends its bullets the same 8 ways, so their velocities are worked out once
+        self.explosion_velocity = VIRUS_BURST.velocities(1, 0)
 
     def load_and_scale_image(self, filename, size):
         try:
@@ -70,17 +87,27 @@ class Boss:
             pygame.quit()
             quit()
 
+    def bake_paths(self, fps=60):
+        """Sample the time-based movement paths once per frame of the clock, the game runs at fps."""
+        # Phases 2 and 3 sway up and down around y=100, one sway takes 2π seconds
+        frames = np.arange(round(2 * math.pi * fps))
+        self.sway_path = (100 + 20 * np.sin(frames / fps)).tolist()
+        # Phase 4 zigzags across the screen and between y=50 and y=150, one zigzag takes 3 seconds
+        turn = 2 * math.pi * np.arange(3 * fps) / (3 * fps)
+        x_min = 50
+        x_max = self.game.screen_width - self.width - 50
+        xs = x_min + (x_max - x_min) * (np.sin(turn) + 1) / 2
+        ys = 50 + (150 - 50) * (np.sin(turn + math.pi / 4) + 1) / 2
+        self.zigzag_path = list(zip(xs.tolist(), ys.tolist()))
+
     def update(self):
+        self.clock += 1
         # Update phase according to current health.
         self.update_phase()
         # Update movement based on phase.
         self.perform_movement()
         # Fire attacks based on phase.
         self.attack_pattern()
-        # Update virus bullets (if any) so they can explode.
-        self.update_virus_bullets()
-        # Check for collisions with player bullets.
-        self.check_hit_by_player()
         # Draw the boss and its health bar.
         self.draw()
 
@@ -129,9 +156,7 @@ class Boss:
         if self.x < x_min or self.x > x_max:
             self.dx = -self.dx
             self.x += self.dx
-        base_y = 100
-        amplitude = 20
-        self.y = base_y + amplitude * math.sin(pygame.time.get_ticks() / 1000.0)
+        self.y = self.sway_path[self.clock % len(self.sway_path)]
 
     def movement_phase3(self):
         # Boss “aims” at the player but with smoothing.
@@ -145,31 +170,21 @@ class Boss:
             dx = -self.speed
         self.x += dx
         # Vertical oscillation (set movement, not pure reaction).
-        base_y = 100
-        amplitude = 20
-        self.y = base_y + amplitude * math.sin(pygame.time.get_ticks() / 1000.0)
+        self.y = self.sway_path[self.clock % len(self.sway_path)]
 
     def movement_phase4(self):
-        # Zigzag movement: use time–based sine functions for both x and y.
-        period = 3000  # period in milliseconds
-        t = pygame.time.get_ticks() % period
-        x_min = 50
-        x_max = self.game.screen_width - self.width - 50
-        sine_val = math.sin(2 * math.pi * t / period)
-        self.x = x_min + (x_max - x_min) * (sine_val + 1) / 2
-        # Vertical oscillation between 50 and 150.
-        self.y = 50 + (150 - 50) * ((math.sin(2 * math.pi * t / period + math.pi/4) + 1) / 2)
+        # Zigzag movement along the path baked in bake_paths().
+        self.x, self.y = self.zigzag_path[self.clock % len(self.zigzag_path)]
 
     def movement_phase5(self):
-        # Erratic movement: update a target position every 2 seconds, then smoothly move toward it.
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_target_update > 2000:
+        # Erratic movement: update a target position every 2 seconds (120 frames), then smoothly move toward it.
+        if self.clock - self.last_target_update > 120:
             x_min = 50
             x_max = self.game.screen_width - self.width - 50
             y_min = 50
             y_max = self.game.screen_height // 3
             self.target_pos = (random.randint(x_min, x_max), random.randint(y_min, y_max))
-            self.last_target_update = current_time
+            self.last_target_update = self.clock
         target_x, target_y = self.target_pos
         dx = target_x - self.x
         dy = target_y - self.y
@@ -182,160 +197,58 @@ class Boss:
 
     # ─── ATTACK PATTERNS ─────────────────────────────────────────────
     def attack_pattern(self):
-        """Select and execute an attack based on the current phase."""
-        if self.phase == 1:
-            self.speed = 6
-            self.phase1_attack()
-        elif self.phase == 2:
-            self.speed = 3
-            self.phase2_attack()
-        elif self.phase == 3:
-            self.speed = 5
-            self.phase3_attack()
-        elif self.phase == 4:
-            self.speed = 3
-            self.phase4_attack()
-        elif self.phase == 5:
-            self.phase5_attack()
-
-    def phase1_attack(self):
-        """Phase 1: Fire a bullet straight down."""
-        current_time = time.time()
-        if current_time - self.last_shot_time < self.phase1_shoot_interval:
-            return
-        self.last_shot_time = current_time
-        self.game.bullet_manager.add_boss_bullet(
-            self.x + self.width // 2, self.y + self.height, dx=0, dy=3
-        )
-
-    def phase2_attack(self):
-        """Phase 2: Spread attack – continuously fire a single bullet with a random angle in a 45° cone (relative to straight down)."""
+        """Fire the current phase's pattern whenever it is due."""
+        self.speed = self.phase_speeds[self.phase] * (self.rage_speed if self.rage_mode else 1)
+        pattern = PHASE_PATTERNS[self.phase]
+        rate = self.fire_rate * (self.rage_fire_rate if self.rage_mode else 1)
         current_time = time.time()
-        if current_time - self.last_shot_time < self.phase2_shoot_interval:
-            return
-        self.last_shot_time = current_time
-
-        # Compute the boss's firing point (center-bottom of the boss image)
-        boss_center_x = self.x + self.width / 2
-        boss_bottom_y = self.y + self.height
-
-        # Choose a random angle between -22.5° and +22.5° (relative to straight down)
-        angle = random.uniform(-90, 90)
-        rad = math.radians(angle)
-    
-        # Calculate bullet velocity components; when angle=0, bullet goes straight down
-        dx = math.sin(rad) * 3  # Horizontal component
-        dy = math.cos(rad) * 3  # Vertical component
-
-        # Fire a single bullet
-        self.game.bullet_manager.add_boss_bullet(boss_center_x, boss_bottom_y, dx, dy)
+        if current_time - self.last_shot_time >= pattern.interval / rate:
+            self.last_shot_time = current_time
+            self.fire_pattern(pattern)
+            self.pending_volleys += [(current_time + volley * pattern.volley_gap / rate, pattern)
+                                     for volley in range(1, pattern.volleys)]
+        if self.pending_volleys:
+            due = [pattern for fire_time, pattern in self.pending_volleys if fire_time <= current_time]
+            self.pending_volleys = [volley for volley in self.pending_volleys if volley[0] > current_time]
+            for pattern in due:
+                self.fire_pattern(pattern)
+
+    def fire_pattern(self, pattern):
+        """Fire one volley of a pattern from the middle of the boss's bottom edge."""
+        x = self.x + self.width // 2
+        y = self.y + self.height
+        heading_x, heading_y = 0, 1  # Straight down
+        if pattern.aimed:
+            player = self.game.player
+            heading_x = player.x + player.width / 2 - x
+            heading_y = player.y + player.height / 2 - y
+        dx, dy = pattern.velocities(heading_x, heading_y)
+        bullet_manager = self.game.bullet_manager
+        if pattern.virus:
+            explode_dist = np.random.uniform(self.min_explosion_dist, self.max_explosion_dist, dx.size)
+            bullet_manager.add_virus_bullets(x, y, dx, dy, explode_dist)
+        else:
+            bullet_manager.add_boss_bullets(x, y, dx, dy)
 
-    def phase3_attack(self):
-        
-        current_time = time.time()
-        if current_time - self.last_shot_time < self.phase3_shoot_interval:
+    def explode_viruses(self, x, y):
+        """Explode virus bullets at the (x, y) arrays, each into a ring of bullets, all spawned as one batch."""
+        if not len(x):
             return
-        self.last_shot_time = current_time
-        player_center_x = self.game.player.x + self.game.player.width / 2
-        player_center_y = self.game.player.y + self.game.player.height / 2
-        boss_center_x = self.x + self.width / 2
-        boss_center_y = self.y + self.height / 2
-        dx = (player_center_x - boss_center_x) / 50.0
-        dy = (player_center_y - boss_center_y) / 50.0
-        # Add slight inaccuracy
-        dx += dx * random.uniform(-0.02, 0.02)
-        dy += dy * random.uniform(-0.02, 0.02)
-        self.game.bullet_manager.add_boss_bullet(
-            self.x + self.width // 2, self.y + self.height, dx, dy
-        )
-
-    def phase4_attack(self):
-        """Phase 4: Circle attack firing a bullet in a random direction."""
-        current_time = time.time()
-        if current_time - self.last_shot_time < self.phase4_shoot_interval:
-            return
-        self.last_shot_time = current_time
-        angle = random.randint(0, 360)
-        rad = math.radians(angle)
-        dx = math.cos(rad) * 3
-        dy = math.sin(rad) * 3
-        self.game.bullet_manager.add_boss_bullet(
-            self.x + self.width // 2, self.y + self.height, dx, dy
-        )
-
-    def phase5_attack(self):
-        current_time = time.time()
-        if current_time - self.last_shot_time < self.phase5_shoot_interval:
-            return
-        self.last_shot_time = current_time
-
-        # Calculate direction to player
-        px = self.game.player.x + self.game.player.width//2
-        py = self.game.player.y + self.game.player.height//2
-        bx = self.x + self.width//2
-        by = self.y + self.height
-
-        dx = px - bx
-        dy = py - by
-        dist = math.hypot(dx, dy)
-        if dist == 0:
-            dx, dy = 0, 1
-        else:
-            dx /= dist
-            dy /= dist
-
-        dx *= self.virus_bullet_speed
-        dy *= self.virus_bullet_speed
-
-        # Create virus bullet with explosion params
-        virus_bullet = {
-            "x": bx, "y": by, "dx": dx, "dy": dy, 
-            "type": "virus", "image": self.virus_bullet_image,
-            "start_x": bx, "start_y": by,
-            "explode_dist": random.uniform(self.min_explosion_dist, self.max_explosion_dist)
-        }
-        self.game.bullet_manager.boss_bullets.append(virus_bullet)
-
-    def update_virus_bullets(self):
-        """Update virus bullets and trigger their explosion when they reach the threshold."""
-
-        explosion_threshold = (5000)
-
-        for bullet in self.game.bullet_manager.boss_bullets[:]:
-            if isinstance(bullet, dict) and bullet.get("type") == "virus":
-                # Update its position
-                bullet["y"] += bullet["dy"]
-
-                if bullet["y"] >= (500):
-                    self.explode_virus(bullet)
-                    self.game.bullet_manager.boss_bullets.remove(bullet)
-
-    def explode_virus(self, bullet):
-        """Explode the virus bullet into several bullets in a circular pattern."""
-        x, y = bullet["x"], bullet["y"]
-        for angle in range(0, 360, 45):
-            rad = math.radians(angle)
-            dx = math.cos(rad) * 4
-            dy = math.sin(rad) * 4
-            self.game.bullet_manager.add_boss_bullet(x, y, dx, dy)
+        dx, dy = self.explosion_velocity
+        count = dx.size
+        self.game.bullet_manager.add_boss_bullets(np.repeat(x, count), np.repeat(y, count),
+                                                  np.tile(dx, len(x)), np.tile(dy, len(x)))
 
     # ─── RAGE MODE ─────────────────────────────────────────────
     def enable_rage_mode(self):
         """
         When called (for example, if the player loses the minigame),
         the boss goes into rage mode:
-         - Movement speed increases by 15%
-         - Shooting intervals decrease by 15% (i.e. shooting faster)
+         - Movement speed is multiplied by rage_speed
+         - Fire rate is multiplied by rage_fire_rate
          - The health bar displays a red "(Rage Mode)" next to its name.
         """
-        if not self.rage_mode:
-            self.rage_mode = True
-            self.speed *= 1.5  # Increase base movement speed
-            self.phase1_shoot_interval *= 0.5
-            self.phase2_shoot_interval *= 0.5
-            self.phase3_shoot_interval *= 0.5
-            self.phase4_shoot_interval *= 0.5
-            self.phase5_shoot_interval *= 0.5
+        self.rage_mode = True
 
     # ─── DRAWING METHODS ─────────────────────────────────────────────
     def draw(self):
@@ -343,9 +256,7 @@ class Boss:
         current_time = time.time()
         if current_time - self.last_animation_time >= self.animation_interval:
             self.animation_toggle = not self.animation_toggle
-            base = self.rage_image if self.rage_mode else self.base_image
-            self.current_image = (pygame.transform.flip(base, True, False)
-                                  if self.animation_toggle else base)
+            self.current_image, self.current_solid = self.frames[self.rage_mode, self.animation_toggle]
             self.last_animation_time = current_time
 
         self.game.screen.blit(self.current_image, (self.x, self.y))
@@ -383,30 +294,37 @@ class Boss:
             self.game.screen.blit(name_text, (name_x, 10))
 
 
-    def check_hit_by_player(self):
-        """Check for collision with player bullets and update health."""
-        for bullet in self.game.bullet_manager.player_bullets[:]:
-            if (self.x < bullet[0] < self.x + self.width and 
-                self.y < bullet[1] < self.y + self.height):
-                self.game.bullet_manager.player_bullets.remove(bullet)
-                self.health -= 1
-                if self.health <= 0:
-                    self.game.change_music(self.game.boss_defeated_music)
-                    self.game.display_feedback("Boss Defeated!", self.game.GREEN)
-                    self.game.end_game_screen()
-                # Trigger the minigame (or rage mode) once when health is low.
-                elif self.health <= 50 and not self.rage_mode and not self.minigame_triggered:
-                    success = HackingMiniGame(self.game).run()
-                    if not success:
-                        self.enable_rage_mode()
-                    self.minigame_triggered = True
-                    
-    def trigger_minigame(self):
-        success = HackingMiniGame(self.game).run()
-        if not success:
-            self.shoot_interval *= 0.8
-            self.rage_mode = True
-        self.minigame_triggered = True
+    def find_hits(self, rows):
+        """The player bullet rows among `rows` that hit the boss this frame."""
+        bullet_manager = self.game.bullet_manager
+        rows = bullet_manager.player_bullets_hitting(self.x, self.y, self.x + self.width, self.y + self.height, rows)
+        if not rows.size:
+            return rows
+        # Only bullets that reach the boss's box are tested against the solid pixels of the frame on screen,
+        # which is blitted at the truncated position
+        x0, y0, x1, y1 = bullet_manager.swept_segments(rows)
+        return rows[segments_cross_solid(x0, y0, x1, y1, self.current_solid, int(self.x), int(self.y))]
+
+    def take_hits(self, count):
+        """Apply all of a frame's player bullet hits to the boss's health at once."""
+        if count <= 0 or self.health <= 0:
+            return
+        self.health = max(0, self.health - count)
+        self.update_phase()
+        if self.health <= 0:
+            self.game.change_music(self.game.boss_defeated_music)
+            self.game.display_feedback("Boss Defeated!", self.game.GREEN)
+            self.game.end_game_screen()
+        else:
+            self.check_minigame_trigger()
+
+    def check_minigame_trigger(self):
+        """Run the hacking minigame once, when health first drops to half. Losing it enrages the boss."""
+        if self.health <= self.max_health // 2 and not self.rage_mode and not self.minigame_triggered:
+            self.minigame_triggered = True
+            success = HackingMiniGame(self.game).run()
+            if not success:
+                self.enable_rage_mode()
         
     def reset_boss(self):
         self.x = self.initial_x
@@ -417,13 +335,11 @@ class Boss:
         self.animation_interval = self.initial_animation_interval
         self.last_shot_time = 0
         self.last_animation_time = 0
-        self.current_image = self.base_image
+        self.current_image, self.current_solid = self.frames[False, False]
         self.direction = 1
         self.rage_mode = False
         self.minigame_triggered = False
-        self.phase1_shoot_interval = 0.15  
-        self.phase2_shoot_interval = 0.1  
-        self.phase3_shoot_interval = 0.5  
-        self.phase4_shoot_interval = 0.07  
-        self.phase5_shoot_interval = 1 
+        self.pending_volleys = []
+        self.clock = 0
+        self.last_target_update = 0
         
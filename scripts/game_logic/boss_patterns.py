@@ -0,0 +1,67 @@
+import math
+import numpy as np
+
+
+class Pattern:
+    """One boss attack, described as data.
+
+    Every `interval` seconds the pattern fires `volleys` volleys, `volley_gap`
+    seconds apart. A volley is `count` bullets at `speed` pixels per frame,
+    spread evenly over an arc of `spread` degrees centred on straight down,
+    or on the player when `aimed`. With `random` each bullet instead takes a
+    random whole-degree direction from that arc. An aimed pattern with
+    `travel_frames` picks the speed that reaches the player's current
+    position in that many frames, and `jitter` scales each velocity
+    component by a random factor within that fraction of 1.
+    """
+
+    def __init__(self, name, interval, count=1, speed=3, spread=0, aimed=False, random=False,
+                 travel_frames=None, jitter=0, volleys=1, volley_gap=0, virus=False):
+        self.name = name
+        self.interval = interval
+        self.count = count
+        self.speed = speed
+        self.aimed = aimed
+        self.random = random
+        self.travel_frames = travel_frames
+        self.jitter = jitter
+        self.volleys = volleys
+        self.volley_gap = volley_gap
+        self.virus = virus  # Fires virus bullets, which explode later (see BulletManager.check_virus_bullets)
+        # Directions relative to the pattern's heading as unit complex numbers, computed once
+        full_circle = spread >= 360
+        if random:
+            degrees = np.arange(360) if full_circle else np.arange(-(spread // 2), spread // 2 + 1)
+        elif count == 1:
+            degrees = np.zeros(1)
+        else:
+            degrees = np.linspace(-spread / 2, spread / 2, count, endpoint=not full_circle)
+        self.directions = np.exp(1j * np.radians(degrees))
+
+    def velocities(self, heading_x, heading_y):
+        """(dx, dy) arrays for one volley, heading is the (not necessarily unit) direction of the arc's centre."""
+        length = math.hypot(heading_x, heading_y)
+        heading = complex(heading_x, heading_y) / length if length else 1j  # Straight down
+        speed = length / self.travel_frames if self.travel_frames else self.speed
+        directions = self.directions
+        if self.random:
+            directions = directions[np.random.randint(0, directions.size, self.count)]
+        velocity = directions * (heading * speed)
+        dx, dy = velocity.real, velocity.imag
+        if self.jitter:
+            dx = dx * (1 + np.random.uniform(-self.jitter, self.jitter, dx.size))
+            dy = dy * (1 + np.random.uniform(-self.jitter, self.jitter, dy.size))
+        return dx, dy
+
+
+# One pattern per boss phase, phase 1 starts at full health
+PHASE_PATTERNS = {
+    1: Pattern("line", interval=0.15, speed=3),                                    # 100%-81%
+    2: Pattern("cone", interval=0.1, speed=3, spread=180, random=True),            # 80%-61%
+    3: Pattern("aimed", interval=0.5, aimed=True, travel_frames=50, jitter=0.02),  # 60%-41%
+    4: Pattern("ring", interval=0.07, speed=3, spread=360, random=True),           # 40%-21%
+    5: Pattern("virus", interval=1, speed=4, aimed=True, virus=True),              # 20%-0%
+}
+
+# What a virus bullet bursts into, 8 bullets 45° apart
+VIRUS_BURST = Pattern("virus burst", interval=0, count=8, speed=4, spread=360)
@@ -1,15 +1,28 @@
 import pygame
 import math
-import time
+import numpy as np
+from scripts.game_logic.bullet_store import (BulletStore, BulletQueue, KIND_PLAYER, KIND_ENEMY, KIND_BOSS,
+                                             KIND_VIRUS, DROP, RECYCLE)
+from scripts.game_logic.spatial_hash import SpatialHash
+from scripts.game_logic.bullet_sprites import BulletSpriteCache
+from scripts.game_logic.collision import segment_box_entry
 
 class BulletManager:
     def __init__(self, game):
-        self.player_bullets = []
-        self.enemy_bullets = []
-        self.boss_bullets = []
+        # Each category lives in its own structure-of-arrays store (see bullet_store.py). The budgets cap
+        # how many bullets of a category exist at once, which keeps the worst-case frame cost fixed
+        self.player_bullets = BulletStore(capacity=512, fields=("length", "angle", ("heading", np.int16)),
+                                          budget=128, policy=DROP)
+        # Enemy bullets all fall at the same speed, so they are kept in order from lowest to highest
+        self.enemy_bullets = BulletQueue(capacity=512, budget=256, policy=DROP)
+        # Rage mode and virus explosions can outpace the budget, the oldest boss bullets make way
+        self.boss_bullets = BulletStore(capacity=1024,
+                                        fields=("start_x", "start_y", "explode_dist", ("heading", np.int16)),
+                                        budget=400, policy=RECYCLE)
         self.bullet_width = 5
         self.player_bullet_height = 10  # Default height for player bullets
         self.enemy_bullet_height = 10   # New attribute for enemy bullet height
+        self.enemy_bullet_mask = pygame.mask.Mask((self.bullet_width, self.enemy_bullet_height), fill=True)
         self.player_bullet_speed = 7
         self.enemy_bullet_speed = 5
         self.player_shoot_interval = 0.2  # Default shoot interval for player
@@ -17,212 +30,227 @@ class BulletManager:
         self.game = game
         self.angle = math.radians(20)
         self.triple_shot = False
+        self.collision_radius = 10  # Adjust for better hitbox size
+        # Broadphase for player bullets intercepting boss/enemy bullets, reports pairs_tested/pairs_hit
+        self.interception_grid = SpatialHash(cell_size=self.collision_radius)
+        # Rotated bullet shapes, each bullet's heading bucket is picked once when it is fired
+        self.sprite_cache = BulletSpriteCache(buckets=64)
 
     def add_player_bullet(self, x, y):
         if self.triple_shot:
             # Middle bullet (straight ahead)
-            self.player_bullets.append([x, y, self.player_bullet_height, 0])  # angle 0 means straight up
+            self.spawn_player_bullet(x, y, 0, self.player_bullet_height)
             # Left bullet (20 degrees to the left)
-            self.player_bullets.append([x - 10, y, self.player_bullet_height, -self.angle])  
+            self.spawn_player_bullet(x - 10, y, -self.angle, self.player_bullet_height)
             # Right bullet (20 degrees to the right)
-            self.player_bullets.append([x + 10, y, self.player_bullet_height, self.angle])
+            self.spawn_player_bullet(x + 10, y, self.angle, self.player_bullet_height)
         else:
-            self.player_bullets.append([x, y, self.player_bullet_height, 0])  # Single shot straight up
+            self.spawn_player_bullet(x, y, 0, self.player_bullet_height)  # Single shot straight up
+
+    def spawn_player_bullet(self, x, y, angle, height):
+        # Velocity is fixed when the bullet is fired, angle 0 means straight up
+        speed = self.player_bullet_speed
+        dx, dy = speed * math.sin(angle), -speed * math.cos(angle)
+        self.player_bullets.spawn(x, y, dx, dy, KIND_PLAYER,
+                                  length=height, angle=angle, heading=self.sprite_cache.bucket(dx, dy))
 
     def add_enemy_bullet(self, x, y):
-        self.enemy_bullets.append([x, y])
+        self.enemy_bullets.spawn(x, y, 0, self.enemy_bullet_speed, KIND_ENEMY)
 
     def add_boss_bullet(self, x, y, dx=0, dy=3):
         # Ensure all parameters are valid numbers
         if all(isinstance(v, (int, float)) for v in [x, y, dx, dy]):
-            self.boss_bullets.append([x, y, dx, dy])
+            self.boss_bullets.spawn(x, y, dx, dy, KIND_BOSS, heading=self.sprite_cache.bucket(dx, dy))
         else:
             return
 
-    def update_player_bullets(self, draw_only=False):
-        if not draw_only:
-            self.check_bullet_collisions()
-        bullets_to_remove = []
-        for bullet in self.player_bullets[:]:
-            x, y, height, angle = bullet
-            # Move bullet based on its angle
-            if not draw_only and angle == 0:  # Straight up
-                bullet[1] -= self.player_bullet_speed
-            elif not draw_only:
-                # Calculate movement based on angle
-                bullet[0] += self.player_bullet_speed * math.sin(angle)  # Horizontal movement
-                bullet[1] -= self.player_bullet_speed * math.cos(angle)  # Vertical movement
-            
-            # Calculate points for drawing a rotated rectangle
-            # Here we're using the bullet's height as its length in the direction of travel
-            rect_points = [
-                (x, y),
-                (x + height * math.sin(angle), y - height * math.cos(angle)),
-                (x + self.bullet_width * math.cos(angle) + height * math.sin(angle), y + self.bullet_width * math.sin(angle) - height * math.cos(angle)),
-                (x + self.bullet_width * math.cos(angle), y + self.bullet_width * math.sin(angle))
-            ]
-            # Draw the rotated rectangle
-            pygame.draw.polygon(self.game.screen, self.game.GREEN, rect_points)
-            
-            # Check for conditions to remove bullet
-            if not draw_only and (bullet[1] < 0 or bullet[0] < 0 or bullet[0] > self.game.screen_width):
-                bullets_to_remove.append(bullet)
-            # Check for enemy collision
-            for enemy in self.game.enemy_manager.enemies[:]:
-                if (enemy[0] < x < enemy[0] + 40 and enemy[1] < y < enemy[1] + 40) or \
-                   (enemy[0] < x + height * math.sin(angle) < enemy[0] + 40 and enemy[1] < y - height * math.cos(angle) < enemy[1] + 40):
-                    bullets_to_remove.append(bullet)
-                    self.game.enemy_manager.enemies.remove(enemy)
-                    break
-            # Remove all bullets marked for deletion
-            for bullet in bullets_to_remove:
-                if bullet in self.player_bullets:  # Double check if the bullet is still in the list
-                    self.player_bullets.remove(bullet)
-
-    def update_enemy_bullets(self, draw_only=False):
-        # Changed from boss_bullets to enemy_bullets
-        for bullet in self.enemy_bullets[:]:  # THIS LINE WAS FIXED
-            if not draw_only:
-                # Move bullet downward
-                bullet[1] += self.enemy_bullet_speed
-        
-            # Draw enemy bullet
-            pygame.draw.rect(self.game.screen, self.game.RED, 
-                            (bullet[0], bullet[1], self.bullet_width, self.enemy_bullet_height))
-        
-            # Remove bullets that go off screen
-            if not draw_only and bullet[1] > self.game.screen_height:
-                self.enemy_bullets.remove(bullet)
-                
-    def update_boss_bullets(self, draw_only=False):
-        for bullet in self.boss_bullets[:]:
-            if isinstance(bullet, dict) and bullet.get("type") == "virus":
-                if not draw_only:
-                    bullet["x"] += bullet["dx"]
-                    bullet["y"] += bullet["dy"]
-
-                    # Check distance traveled
-                    traveled = math.hypot(bullet["x"]-bullet["start_x"], 
-                                        bullet["y"]-bullet["start_y"])
-                    if traveled >= bullet["explode_dist"]:
-                        self.game.boss.explode_virus(bullet)
-                        self.boss_bullets.remove(bullet)
-                        continue
-
-                    # Check player proximity
-                    px = self.game.player.x + self.game.player.width//2
-                    py = self.game.player.y + self.game.player.height//2
-                    dist_to_player = math.hypot(bullet["x"]-px, bullet["y"]-py)
-                    if dist_to_player < self.game.boss.player_explode_threshold:
-                        self.game.boss.explode_virus(bullet)
-                        self.boss_bullets.remove(bullet)
-                        continue
-
-                self.game.screen.blit(bullet["image"], (bullet["x"], bullet["y"]))
-
-            elif isinstance(bullet, list) and len(bullet) == 4:
-                if not draw_only:
-                    bullet[0] += bullet[2]  # x += dx
-                    bullet[1] += bullet[3]  # y += dy
-
-                # Calculate angle in radians
-                angle = math.atan2(bullet[3], bullet[2])
-
-                # Bullet dimensions (keeping original proportions)
-                width = self.enemy_bullet_height
-                height =  self.bullet_width # This is now the bullet's "length"
-
-                # Center of the bullet
-                cx, cy = bullet[0] + width / 2, bullet[1] + height / 2
-
-                # Calculate rotated rectangle corners
-                cos_a = math.cos(angle)
-                sin_a = math.sin(angle)
-
-                half_w, half_h = width / 2, height / 2
-
-                points = [
-                    (cx - half_w * cos_a - half_h * sin_a, cy - half_w * sin_a + half_h * cos_a),  # Top-left
-                    (cx + half_w * cos_a - half_h * sin_a, cy + half_w * sin_a + half_h * cos_a),  # Top-right
-                    (cx + half_w * cos_a + half_h * sin_a, cy + half_w * sin_a - half_h * cos_a),  # Bottom-right
-                    (cx - half_w * cos_a + half_h * sin_a, cy - half_w * sin_a - half_h * cos_a)   # Bottom-left
-                ]
-
-                # Draw the rotated rectangle
-                pygame.draw.polygon(self.game.screen, self.game.YELLOW, points)
-
-                # Remove bullets that go off screen
-                if not draw_only and (cx < 0 or cx > self.game.screen_width or cy < 0 or cy > self.game.screen_height):
-                    self.boss_bullets.remove(bullet)
-
-            else:
-                self.boss_bullets.remove(bullet)
-                
-    def check_bullet_collisions(self):
-        bullets_to_remove = []
-        collision_radius = 10  # Adjust for better hitbox size
-
-        # Check for collisions between player bullets and boss bullets
-        for p_bullet in self.player_bullets[:]:
-            px, py, _, _ = p_bullet  # Player bullet position
-
-            for b_bullet in self.boss_bullets[:]:
-                if isinstance(b_bullet, list) and len(b_bullet) == 4:
-                    bx, by, _, _ = b_bullet  # Normal boss bullet
-                elif isinstance(b_bullet, dict) and "x" in b_bullet and "y" in b_bullet:
-                    bx, by = b_bullet["x"], b_bullet["y"]  # Virus bullet dictionary
-                else:
-                    continue  # Skip invalid bullets
-
-                # Distance-based collision check
-                if math.hypot(px - bx, py - by) < collision_radius:
-                    # If this is a virus bullet, trigger its explosion before removing it
-                    if isinstance(b_bullet, dict) and b_bullet.get("type") == "virus":
-                        self.game.boss.explode_virus(b_bullet)
-                    bullets_to_remove.append((p_bullet, b_bullet))
-
-            # Check for collisions between player bullets and normal enemy bullets
-            for e_bullet in self.game.bullet_manager.enemy_bullets[:]:
-                ex, ey = e_bullet  # Enemy bullet position
-
-                if math.hypot(px - ex, py - ey) < collision_radius:
-                    bullets_to_remove.append((p_bullet, e_bullet))
-
-        # Remove collided bullets
-        for p_bullet, enemy_bullet in bullets_to_remove:
-            if p_bullet in self.player_bullets:
-                self.player_bullets.remove(p_bullet)
-            if enemy_bullet in self.boss_bullets:
-                self.boss_bullets.remove(enemy_bullet)
-            elif enemy_bullet in self.enemy_bullets:
-                self.enemy_bullets.remove(enemy_bullet)
-
-
-
-    def check_player_hit(self):
-        for bullet in self.enemy_bullets[:]:
-            if (self.game.player.x < bullet[0] < self.game.player.x + self.game.player.width and 
-                self.game.player.y < bullet[1] < self.game.player.y + self.game.player.height):
-                if not self.game.player.invulnerable:
-                    self.enemy_bullets.remove(bullet)
-                    self.game.last_hit_time = time.time()
-                    return True
-                self.enemy_bullets.remove(bullet)
-        return False
+    def add_boss_bullets(self, x, y, dx, dy):
+        """A volley of boss bullets in one batch, any argument may be an array."""
+        self.boss_bullets.spawn_many(x, y, dx, dy, KIND_BOSS, heading=self.sprite_cache.bucket(dx, dy))
+
+    def add_virus_bullets(self, x, y, dx, dy, explode_dist):
+        self.boss_bullets.spawn_many(x, y, dx, dy, KIND_VIRUS, start_x=x, start_y=y, explode_dist=explode_dist)
+
+    def update(self):
+        """Move every bullet, hits are found and applied afterwards by the collision phase."""
+        self.player_bullets.step()
+        self.enemy_bullets.step()
+        self.boss_bullets.step()
+        self.check_virus_bullets()
+
+    def remove_dead(self):
+        """Cull bullets that left the screen and close the holes left by this frame's hits."""
+        # Player hits are swept over the whole move, so culling waits until after the collision phase
+        bullets = self.player_bullets
+        n = bullets.count
+        x, y = bullets.x[:n], bullets.y[:n]
+        bullets.cull((y < 0) | (x < 0) | (x > self.game.screen_width))
+        bullets.compact()
+
+        # Enemy bullets that went off screen are all at the head of the queue
+        self.enemy_bullets.pop_below(self.game.screen_height)
+        self.enemy_bullets.compact()
+
+        # Remove boss bullets whose centre leaves the screen, virus bullets explode before that
+        bullets = self.boss_bullets
+        n = bullets.count
+        cx = bullets.x[:n] + self.enemy_bullet_height / 2
+        cy = bullets.y[:n] + self.bullet_width / 2
+        off_screen = (cx < 0) | (cx > self.game.screen_width) | (cy < 0) | (cy > self.game.screen_height)
+        bullets.cull(off_screen & (bullets.kind[:n] == KIND_BOSS))
+        bullets.compact()
+
+    def draw(self):
+        self.draw_player_bullets()
+        self.draw_enemy_bullets()
+        self.draw_boss_bullets()
+
+    def draw_player_bullets(self):
+        bullets = self.player_bullets
+        live = bullets.live()
+        n = bullets.count
+        x, y = bullets.x[:n][live], bullets.y[:n][live]
+        headings = bullets.heading[:n][live]
+        length = bullets.length[:n][live]
+        # The bullet's height is its length in the direction of travel, Laser bullets are longer
+        for height in np.unique(length).tolist():
+            same = length == height
+            self.sprite_cache.draw(self.game.screen, self.game.GREEN, height, self.bullet_width,
+                                   x[same], y[same], headings[same])
+
+    def find_enemy_hits(self, rows):
+        """(player bullet rows, formation cells) of bullets that hit an enemy this frame.
+
+        Each bullet takes out the first enemy on its path and each enemy only
+        absorbs one bullet.
+        """
+        if not rows.size:
+            return rows, rows
+        hits, cells = self.game.enemy_manager.formation.find_hits(*self.swept_segments(rows))
+        return rows[hits], cells
+
+    def swept_segments(self, rows):
+        """Path each player bullet covered this frame, from last frame's tail to the current tip.
+
+        Testing the whole path means fast Laser bullets cannot skip over an
+        enemy or a barricade block between two frames.
+        """
+        bullets = self.player_bullets
+        x, y = bullets.x[rows], bullets.y[rows]
+        dx, dy = bullets.dx[rows], bullets.dy[rows]
+        scale = bullets.length[rows] / np.hypot(dx, dy)
+        return x - dx, y - dy, x + dx * scale, y + dy * scale
+
+    def player_bullets_hitting(self, left, top, right, bottom, rows=None):
+        """Player bullet rows (all live ones by default) whose path this frame crosses the rectangle."""
+        if rows is None:
+            rows = self.player_bullets.live_rows()
+        x0, y0, x1, y1 = self.swept_segments(rows)
+        return rows[np.isfinite(segment_box_entry(x0, y0, x1, y1, left, top, right, bottom))]
+
+    def bullets_touching(self, store, mask, x, y):
+        """Rows of enemy or boss bullets that, as drawn, overlap `mask` placed at (x, y).
+
+        A bounding box test picks the candidates, only those get the
+        per-pixel mask overlap test. Virus bullets are left out of boss
+        bullet tests, they explode near their target instead.
+        """
+        width, height = mask.get_size()
+        if store is self.enemy_bullets:
+            rows = store.in_rect(x - self.bullet_width, y - self.enemy_bullet_height, x + width, y + height)
+            shapes = [(self.enemy_bullet_mask, bx, by)
+                      for bx, by in zip(store.x[rows].tolist(), store.y[rows].tolist())]
+        else:
+            # Boss bullets are drawn rotated around their centre, see draw_boss_bullets()
+            length, thickness = self.enemy_bullet_height, self.bullet_width
+            masks = self.sprite_cache.masks(self.game.YELLOW, length, thickness, centered=True)
+            _, offsets_x, offsets_y = self.sprite_cache.sprites(self.game.YELLOW, length, thickness, centered=True)
+            reach = length + thickness
+            rows = store.in_rect(x - reach, y - reach, x + width + reach, y + height + reach, kind=KIND_BOSS)
+            buckets = store.heading[rows]
+            left = store.x[rows] + length / 2 + offsets_x[buckets]
+            top = store.y[rows] + thickness / 2 + offsets_y[buckets]
+            shapes = [(masks[b], bx, by) for b, bx, by in zip(buckets.tolist(), left.tolist(), top.tolist())]
+        # Offsets are in whole pixels, truncated like blit positions
+        hit = [mask.overlap(shape, (int(bx) - int(x), int(by) - int(y))) is not None for shape, bx, by in shapes]
+        return rows[np.array(hit, dtype=bool)] if rows.size else rows
+
+    def draw_enemy_bullets(self):
+        bullets = self.enemy_bullets
+        rows = bullets.live_rows()
+        for x, y in zip(bullets.x[rows].tolist(), bullets.y[rows].tolist()):
+            pygame.draw.rect(self.game.screen, self.game.RED, (x, y, self.bullet_width, self.enemy_bullet_height))
+
+    def draw_boss_bullets(self):
+        bullets = self.boss_bullets
+        # Bullet dimensions (keeping original proportions)
+        width = self.enemy_bullet_height
+        height = self.bullet_width  # This is now the bullet's "length"
+        n = bullets.count
+        virus = bullets.live(KIND_VIRUS)
+        image = self.game.boss.virus_bullet_image
+        self.game.screen.blits([(image, (x, y)) for x, y in zip(bullets.x[:n][virus].tolist(),
+                                                                bullets.y[:n][virus].tolist())], doreturn=False)
+
+        normal = bullets.live(KIND_BOSS)
+        # Drawn around the bullet's centre, long side along the direction of travel
+        self.sprite_cache.draw(self.game.screen, self.game.YELLOW, width, height,
+                               bullets.x[:n][normal] + width / 2, bullets.y[:n][normal] + height / 2,
+                               bullets.heading[:n][normal], centered=True)
+
+    def check_virus_bullets(self):
+        """Pop the virus bullets that are due this frame, this is the only place that handles them.
+
+        A virus explodes once it has travelled its explosion distance, comes
+        near the player or falls low enough. Distances are compared squared.
+        """
+        bullets = self.boss_bullets
+        rows = bullets.live_rows(KIND_VIRUS)
+        if not rows.size:
+            return
+        boss = self.game.boss
+        x, y = bullets.x[rows], bullets.y[rows]
+        # Check distance traveled
+        traveled = (x - bullets.start_x[rows]) ** 2 + (y - bullets.start_y[rows]) ** 2
+        # Check player proximity
+        px = self.game.player.x + self.game.player.width // 2
+        py = self.game.player.y + self.game.player.height // 2
+        to_player = (x - px) ** 2 + (y - py) ** 2
+        pop = ((traveled >= bullets.explode_dist[rows] ** 2) | (to_player < boss.player_explode_threshold ** 2)
+               | (y >= boss.virus_explode_y))
+        if not pop.any():
+            return
+        # Killed before exploding, a recycled row may hand one of them to a new bullet
+        bullets.kill(rows[pop])
+        boss.explode_viruses(x[pop], y[pop])
+
+    def find_interceptions(self, p_rows, b_rows, e_rows):
+        """Rows of the player, boss and enemy bullets that ran into each other this frame."""
+        empty = np.empty(0, dtype=np.intp)
+        if not p_rows.size or (not b_rows.size and not e_rows.size):
+            return empty, empty, empty
+        # Boss bullets (virus bullets included) and normal enemy bullets share one grid, rebuilt every frame
+        self.interception_grid.build(
+            np.concatenate((self.boss_bullets.x[b_rows], self.enemy_bullets.x[e_rows])),
+            np.concatenate((self.boss_bullets.y[b_rows], self.enemy_bullets.y[e_rows]))
+        )
+        # Distance-based collision check, only against bullets in neighbouring cells
+        hit_players, hit_targets = self.interception_grid.query(
+            self.player_bullets.x[p_rows], self.player_bullets.y[p_rows], self.collision_radius
+        )
+        hit_boss = b_rows[hit_targets[hit_targets < b_rows.size]]
+        hit_enemy = e_rows[hit_targets[hit_targets >= b_rows.size] - b_rows.size]
+        return np.unique(p_rows[hit_players]), np.unique(hit_boss), np.unique(hit_enemy)
+
+    def budget_counters(self):
+        """Spawn, cull and cap-hit counts per bullet category, plus how many rows each one uses.
+
+        A cap hit is a dropped spawn under the DROP policy and a recycled bullet under RECYCLE.
+        """
+        stores = {"player": self.player_bullets, "enemy": self.enemy_bullets, "boss": self.boss_bullets}
+        return {name: {"live": len(store), "budget": store.budget, "spawned": store.spawned,
+                       "culled": store.culled, "cap_hits": store.cap_hits, "policy": store.policy}
+                for name, store in stores.items()}
 
     def reset_triple_shot(self):
         self.triple_shot = False
-
-    def check_player_hit_by_boss_bullet(self):
-        for bullet in self.boss_bullets[:]:
-            if not isinstance(bullet, list) or len(bullet) < 4:
-                continue  # Skip malformed bullets
-        
-            # Access bullet as a list
-            if (self.game.player.x < bullet[0] < self.game.player.x + self.game.player.width and
-                self.game.player.y < bullet[1] < self.game.player.y + self.game.player.height):
-                if not self.game.player.invulnerable:
-                    self.boss_bullets.remove(bullet)
-                    return True
-        return False
-    
@@ -0,0 +1,78 @@
+import math
+import pygame
+import numpy as np
+
+
+class BulletSpriteCache:
+    """Rotated bullet rectangles pre-rendered once per quantised heading.
+
+    A bullet picks its heading bucket when it is spawned, drawing it is then
+    a single blit of the cached surface at the bullet position plus the
+    bucket's offset.
+    """
+
+    def __init__(self, buckets=64):
+        self.buckets = buckets
+        self._sets = {}
+        self._masks = {}
+
+    def bucket(self, dx, dy):
+        """Heading bucket for a velocity, works on scalars and arrays; (0, 0) points right."""
+        turns = np.arctan2(dy, dx) / (2 * math.pi)
+        return np.rint(turns * self.buckets).astype(np.int16) % self.buckets
+
+    def sprites(self, color, length, width, centered=False):
+        """(surfaces, x offsets, y offsets) for every bucket of one bullet shape.
+
+        The rectangle is `length` long along the heading and `width` wide. It is
+        anchored at its centre when `centered`, otherwise at the back corner
+        with the width extending clockwise of the heading.
+        """
+        key = (tuple(color), length, width, centered)
+        if key not in self._sets:
+            self._sets[key] = self._render_set(color, length, width, centered)
+        return self._sets[key]
+
+    def masks(self, color, length, width, centered=False):
+        """Collision mask of every bucket's sprite, placed at the same offsets as sprites()."""
+        key = (tuple(color), length, width, centered)
+        if key not in self._masks:
+            surfaces = self.sprites(color, length, width, centered)[0]
+            self._masks[key] = [pygame.mask.from_surface(surface) for surface in surfaces]
+        return self._masks[key]
+
+    def _render_set(self, color, length, width, centered):
+        surfaces = []
+        offsets_x = np.zeros(self.buckets)
+        offsets_y = np.zeros(self.buckets)
+        for index in range(self.buckets):
+            angle = 2 * math.pi * index / self.buckets
+            ux, uy = math.cos(angle), math.sin(angle)
+            px, py = -uy, ux
+            if centered:
+                along, across = (-length / 2, length / 2), (-width / 2, width / 2)
+            else:
+                along, across = (0, length), (0, width)
+            corners = [(a * ux + b * px, a * uy + b * py)
+                       for a, b in ((along[0], across[0]), (along[1], across[0]),
+                                    (along[1], across[1]), (along[0], across[1]))]
+            # One pixel of padding so the polygon edges are not clipped
+            min_x = math.floor(min(c[0] for c in corners)) - 1
+            min_y = math.floor(min(c[1] for c in corners)) - 1
+            size = (math.ceil(max(c[0] for c in corners)) - min_x + 2,
+                    math.ceil(max(c[1] for c in corners)) - min_y + 2)
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.polygon(surface, color, [(cx - min_x, cy - min_y) for cx, cy in corners])
+            surfaces.append(surface)
+            offsets_x[index] = min_x
+            offsets_y[index] = min_y
+        return surfaces, offsets_x, offsets_y
+
+    def draw(self, screen, color, length, width, x, y, buckets, centered=False):
+        """Blit one cached sprite per bullet, x/y/buckets are arrays of the same length."""
+        if not len(buckets):
+            return
+        surfaces, offsets_x, offsets_y = self.sprites(color, length, width, centered)
+        left = (x + offsets_x[buckets]).tolist()
+        top = (y + offsets_y[buckets]).tolist()
+        screen.blits([(surfaces[b], (l, t)) for b, l, t in zip(buckets.tolist(), left, top)], doreturn=False)
@@ -0,0 +1,300 @@
+import numpy as np
+
+# Values stored in the "kind" column
+KIND_PLAYER = 0
+KIND_ENEMY = 1
+KIND_BOSS = 2
+KIND_VIRUS = 3
+
+# Budget policies, what a spawn does once a store holds its budgeted number of bullets
+DROP = "drop"        # The new bullet is not spawned
+RECYCLE = "recycle"  # The oldest bullet is replaced by the new one
+
+
+class BulletStore:
+    """Fixed-capacity structure-of-arrays pool for one category of bullets.
+
+    Live bullets are packed into rows [0, count), rows [count, capacity) are
+    the free list. Hit tests only flag rows as dead, compact() then fills the
+    holes with live rows from the tail, so a removal moves one row instead of
+    shifting the whole list. Nothing is allocated per bullet.
+
+    The budget caps how many rows the store may use at once (at most the
+    capacity), which bounds the per-frame cost of every pass over it. What a
+    spawn does past the budget is set by the policy. spawned, culled and
+    cap_hits count what happened since the last reset_counters().
+    """
+
+    def __init__(self, capacity=512, fields=(), budget=None, policy=DROP):
+        self.capacity = capacity
+        self.budget = capacity if budget is None else min(budget, capacity)
+        self.policy = policy
+        self.spawned = 0   # Bullets spawned, recycled ones included
+        self.culled = 0    # Bullets removed for leaving the screen
+        self.cap_hits = 0  # Spawns that found the store at its budget
+        self.next_born = 0
+        self.head = 0  # Live rows are [head, count), only BulletQueue moves the head
+        self.count = 0
+        # Extra per-category columns, given as a name (float) or a (name, dtype) pair
+        specs = [field if isinstance(field, tuple) else (field, np.float64) for field in fields]
+        self.fields = tuple(name for name, _ in specs)
+        # born is a spawn sequence number, the lowest live one is the oldest bullet
+        self.columns = ("x", "y", "dx", "dy", "born") + self.fields
+        base = [("x", np.float64), ("y", np.float64), ("dx", np.float64), ("dy", np.float64), ("born", np.int64)]
+        for name, dtype in base + specs:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self.count - self.head
+
+    def spawn(self, x, y, dx, dy, kind=0, **extra):
+        """Take a row from the free list, returns the new row or -1 when the spawn is dropped."""
+        if len(self) >= self.budget:
+            self.cap_hits += 1
+            if self.policy != RECYCLE:
+                return -1
+            row = self._recycle_row()
+        else:
+            row = self.count
+            self.count += 1
+        self._write(row, x, y, dx, dy, kind, extra)
+        return row
+
+    def _recycle_row(self):
+        # Dead rows waiting for compaction go first, then the oldest live bullet
+        window = slice(self.head, self.count)
+        return self.head + int(np.argmin(np.where(self.alive[window], self.born[window], -1)))
+
+    def _write(self, row, x, y, dx, dy, kind, extra):
+        self.x[row] = x
+        self.y[row] = y
+        self.dx[row] = dx
+        self.dy[row] = dy
+        for name in self.fields:
+            getattr(self, name)[row] = extra.get(name, 0)
+        self.born[row] = self.next_born
+        self.next_born += 1
+        self.kind[row] = kind
+        self.alive[row] = True
+        self.spawned += 1
+
+    def spawn_many(self, x, y, dx, dy, kind=0, **extra):
+        """Append a batch of bullets; every argument may be a scalar or an array.
+
+        Returns how many were spawned. Past the budget the rest of the batch
+        is dropped, or recycles the oldest bullets one by one.
+        """
+        shape = np.broadcast(x, y, dx, dy).shape
+        total = int(np.prod(shape))
+        size = max(0, min(total, self.budget - len(self)))
+        columns = [("x", x), ("y", y), ("dx", dx), ("dy", dy)]
+        columns += [(name, extra.get(name, 0)) for name in self.fields]
+        if size:
+            start = self.count
+            end = start + size
+            for name, values in columns:
+                getattr(self, name)[start:end] = np.broadcast_to(values, shape).ravel()[:size]
+            self.born[start:end] = np.arange(self.next_born, self.next_born + size)
+            self.next_born += size
+            self.kind[start:end] = kind
+            self.alive[start:end] = True
+            self.count = end
+            self.spawned += size
+        if size == total:
+            return size
+        if self.policy != RECYCLE:
+            self.cap_hits += total - size
+            return size
+        flat = {name: np.broadcast_to(values, shape).ravel() for name, values in columns}
+        for i in range(size, total):
+            self.spawn(flat["x"][i], flat["y"][i], flat["dx"][i], flat["dy"][i], kind,
+                       **{name: flat[name][i] for name in self.fields})
+        return total
+
+    def step(self):
+        window = slice(self.head, self.count)
+        self.x[window] += self.dx[window]
+        self.y[window] += self.dy[window]
+
+    def live(self, kind=None):
+        """Boolean mask over rows [head, count) of bullets that are still alive."""
+        window = slice(self.head, self.count)
+        mask = self.alive[window]
+        if kind is not None:
+            mask = mask & (self.kind[window] == kind)
+        return mask
+
+    def live_rows(self, kind=None):
+        return np.flatnonzero(self.live(kind)) + self.head
+
+    def in_rect(self, left, top, right, bottom, kind=None):
+        """Rows whose (x, y) lies strictly inside the rectangle."""
+        window = slice(self.head, self.count)
+        x = self.x[window]
+        y = self.y[window]
+        mask = self.live(kind) & (x > left) & (x < right) & (y > top) & (y < bottom)
+        return np.flatnonzero(mask) + self.head
+
+    def kill(self, rows):
+        """Flag bullets as dead, by row index or by a boolean mask over [head, count)."""
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            self.alive[self.head:self.head + rows.size][rows] = False
+        else:
+            self.alive[rows] = False
+
+    def cull(self, rows):
+        """kill() for bullets that left the screen, the live ones are counted in culled."""
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows) + self.head
+        self.culled += int(np.count_nonzero(self.alive[rows]))
+        self.alive[rows] = False
+
+    def reset_counters(self):
+        self.spawned = 0
+        self.culled = 0
+        self.cap_hits = 0
+
+    def compact(self):
+        n = self.count
+        dead = np.flatnonzero(~self.alive[:n])
+        if not dead.size:
+            return
+        kept = n - dead.size
+        # Live rows past the new end swap places with the holes left before it
+        holes = dead[dead < kept]
+        if holes.size:
+            movers = kept + np.flatnonzero(self.alive[kept:n])
+            for name in self.columns + ("kind",):
+                column = getattr(self, name)
+                column[holes] = column[movers]
+            self.alive[holes] = True
+        self.alive[kept:n] = False
+        self.count = kept
+
+    def clear(self):
+        self.alive[self.head:self.count] = False
+        self.count = 0
+
+    def rows(self, *columns, kind=None):
+        """Plain Python lists of the requested columns, one tuple per live bullet (used for saving)."""
+        mask = self.live(kind)
+        values = [getattr(self, name)[self.head:self.count][mask].tolist() for name in columns]
+        return list(zip(*values))
+
+
+class BulletQueue(BulletStore):
+    """Pool for bullets that all fall straight down at the same speed.
+
+    Equal speeds never change the bullets' order, so rows [head, count) stay
+    sorted from lowest on screen to highest. Culling pops rows off the head,
+    rectangle tests binary-search the y band they need and compact() keeps
+    the order intact.
+    """
+
+    def _ascending_y(self):
+        # Reversed view of the window, no copy is made
+        return self.y[self.head:self.count][::-1]
+
+    def spawn(self, x, y, dx, dy, kind=0, **extra):
+        if len(self) >= self.budget:
+            self.cap_hits += 1
+            if self.policy != RECYCLE:
+                return -1
+            # The head is the lowest bullet on screen, the next one to leave anyway
+            self._drop_head()
+        if self.count >= self.capacity:
+            if not self.head:
+                return -1
+            self._rebase()
+        # New bullets are usually the highest on screen and go to the tail, otherwise make room
+        row = self.count - int(np.searchsorted(self._ascending_y(), y, side="left"))
+        if row < self.count:
+            moved = slice(row + 1, self.count + 1)
+            for name in self.columns + ("kind", "alive"):
+                column = getattr(self, name)
+                column[moved] = column[row:self.count]
+        self.count += 1
+        self._write(row, x, y, dx, dy, kind, extra)
+        return row
+
+    def spawn_many(self, x, y, dx, dy, kind=0, **extra):
+        spawned = 0
+        for values in np.broadcast(x, y, dx, dy):
+            if self.spawn(*values, kind, **extra) < 0:
+                # Dropped spawns past the one that failed count as cap hits too
+                self.cap_hits += np.broadcast(x, y, dx, dy).size - spawned - 1
+                break
+            spawned += 1
+        return spawned
+
+    def step(self):
+        window = slice(self.head, self.count)
+        self.y[window] += self.dy[window]
+
+    def band(self, top, bottom):
+        """Row range [start, end) of the bullets with top <= y <= bottom."""
+        ys = self._ascending_y()
+        low = int(np.searchsorted(ys, top, side="left"))
+        high = int(np.searchsorted(ys, bottom, side="right"))
+        return self.count - high, self.count - low
+
+    def in_rect(self, left, top, right, bottom, kind=None):
+        start, end = self.band(top, bottom)
+        x = self.x[start:end]
+        y = self.y[start:end]
+        mask = self.alive[start:end] & (x > left) & (x < right) & (y > top) & (y < bottom)
+        if kind is not None:
+            mask &= self.kind[start:end] == kind
+        return np.flatnonzero(mask) + start
+
+    def pop_below(self, limit):
+        """Drop every bullet whose y is past limit, they are all at the head. Returns how many."""
+        ys = self._ascending_y()
+        popped = ys.size - int(np.searchsorted(ys, limit, side="right"))
+        if popped:
+            dropped = slice(self.head, self.head + popped)
+            self.culled += int(np.count_nonzero(self.alive[dropped]))
+            self.alive[dropped] = False
+            self.head += popped
+            if self.head == self.count:
+                self.head = self.count = 0
+        return popped
+
+    def _drop_head(self):
+        self.alive[self.head] = False
+        self.head += 1
+        if self.head == self.count:
+            self.head = self.count = 0
+
+    def compact(self):
+        window = slice(self.head, self.count)
+        keep = self.alive[window]
+        kept = int(np.count_nonzero(keep))
+        if kept == keep.size:
+            return
+        end = self.head + kept
+        # Shift the survivors down in order, the rows behind them go back to the free list
+        for name in self.columns + ("kind",):
+            column = getattr(self, name)
+            column[self.head:end] = column[window][keep]
+        self.alive[self.head:end] = True
+        self.alive[end:self.count] = False
+        self.count = end
+
+    def clear(self):
+        super().clear()
+        self.head = 0
+
+    def _rebase(self):
+        # Move the live rows back to the start of the arrays
+        size = self.count - self.head
+        for name in self.columns + ("kind", "alive"):
+            column = getattr(self, name)
+            column[:size] = column[self.head:self.count]
+        self.alive[size:self.count] = False
+        self.head = 0
+        self.count = size
@@ -0,0 +1,84 @@
+import numpy as np
+
+
+def _slab(start, delta, low, high):
+    # Fractions of the segment where it crosses the two sides of one axis
+    t_low = (low - start) / delta
+    t_high = (high - start) / delta
+    near = np.minimum(t_low, t_high)
+    far = np.maximum(t_low, t_high)
+    # A segment parallel to the axis is either inside the slab the whole way or never
+    parallel = delta == 0
+    inside = (start >= low) & (start <= high)
+    near = np.where(parallel, np.where(inside, -np.inf, np.inf), near)
+    far = np.where(parallel, np.where(inside, np.inf, -np.inf), far)
+    return near, far
+
+
+def segment_box_entry(x0, y0, x1, y1, left, top, right, bottom):
+    """Fraction along each segment where it first enters each box, inf where it misses.
+
+    All arguments broadcast, so (n, 1) shaped segments against (m,) shaped
+    boxes give an (n, m) result.
+    """
+    x0, y0, x1, y1 = (np.asarray(value, dtype=np.float64) for value in (x0, y0, x1, y1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_near, x_far = _slab(x0, x1 - x0, left, right)
+        y_near, y_far = _slab(y0, y1 - y0, top, bottom)
+    enter = np.maximum(np.maximum(x_near, y_near), 0.0)
+    leave = np.minimum(np.minimum(x_far, y_far), 1.0)
+    return np.where(enter <= leave, enter, np.inf)
+
+
+def grid_first_entry(x0, y0, x1, y1, occupied, origin_x, origin_y, spacing_x, spacing_y, cell_width, cell_height):
+    """(entry fraction, flat cell index) of the first occupied cell each segment enters.
+
+    Cell (row, col) of the `occupied` grid is the cell_width x cell_height box
+    at (origin_x + col * spacing_x, origin_y + row * spacing_y). Each segment
+    is only tested against the cells under its bounding box, so the cost per
+    segment depends on its length and the spacing, not on the grid's size.
+    Segments that enter no cell get an inf fraction and cell -1.
+    """
+    x0, y0, x1, y1 = (np.asarray(value, dtype=np.float64) for value in (x0, y0, x1, y1))
+    if not x0.size:
+        return np.empty(0), np.empty(0, dtype=np.intp)
+    grid_rows, grid_cols = occupied.shape
+    low_x, low_y = np.minimum(x0, x1), np.minimum(y0, y1)
+    col0 = np.floor((low_x - origin_x) / spacing_x).astype(np.intp)
+    row0 = np.floor((low_y - origin_y) / spacing_y).astype(np.intp)
+    # Candidate cells as (row, col) steps from each segment's top-left cell
+    span_cols = int(np.ceil((np.maximum(x0, x1) - low_x).max() / spacing_x)) + 1
+    span_rows = int(np.ceil((np.maximum(y0, y1) - low_y).max() / spacing_y)) + 1
+    step_rows, step_cols = np.indices((span_rows, span_cols)).reshape(2, -1)
+    rows = row0[:, None] + step_rows
+    cols = col0[:, None] + step_cols
+    inside = (rows >= 0) & (rows < grid_rows) & (cols >= 0) & (cols < grid_cols)
+    candidate = inside & occupied[np.clip(rows, 0, grid_rows - 1), np.clip(cols, 0, grid_cols - 1)]
+    left = origin_x + cols * spacing_x
+    top = origin_y + rows * spacing_y
+    entry = segment_box_entry(x0[:, None], y0[:, None], x1[:, None], y1[:, None],
+                              left, top, left + cell_width, top + cell_height)
+    entry = np.where(candidate, entry, np.inf)
+    first = entry.argmin(axis=1)
+    index = np.arange(x0.size)
+    fraction = entry[index, first]
+    cells = np.where(np.isfinite(fraction), rows[index, first] * grid_cols + cols[index, first], -1)
+    return fraction, cells
+
+
+def segments_cross_solid(x0, y0, x1, y1, solid, left, top):
+    """Which segments pass over a set pixel of `solid`, an [x, y] boolean grid with its corner at (left, top).
+
+    Each segment is sampled at points half a pixel apart, so a hit on a thin
+    part of a sprite is not missed.
+    """
+    x0, y0, x1, y1 = (np.asarray(value, dtype=np.float64) for value in (x0, y0, x1, y1))
+    if not x0.size:
+        return np.zeros(0, dtype=bool)
+    steps = int(np.ceil(2 * np.hypot(x1 - x0, y1 - y0).max())) + 1
+    t = np.linspace(0.0, 1.0, steps + 1)
+    xs = np.floor(x0[:, None] + (x1 - x0)[:, None] * t - left).astype(np.intp)
+    ys = np.floor(y0[:, None] + (y1 - y0)[:, None] * t - top).astype(np.intp)
+    width, height = solid.shape
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    return (inside & solid[np.clip(xs, 0, width - 1), np.clip(ys, 0, height - 1)]).any(axis=1)
@@ -0,0 +1,128 @@
+import time
+import numpy as np
+from scripts.game_logic.bullet_store import KIND_VIRUS
+
+# Event types in the collision buffer
+INTERCEPT = 0      # Player bullets and the boss/enemy bullets they shot down
+HIT_BARRICADE = 1  # Bullets stopped by a barricade block
+HIT_ENEMY = 2      # Player bullets that hit an enemy
+HIT_BOSS = 3       # Player bullets that hit the boss
+HIT_PLAYER = 4     # The enemy or boss bullet that hit the player
+SHIELDED = 5       # Enemy bullets that hit the player while invulnerable
+
+
+class CollisionPhase:
+    """Every hit test of a frame, followed by one pass that applies the results.
+
+    gather() only reads the world and appends (event, store, rows, targets)
+    records to the event buffer. A bullet is claimed by the first event it
+    takes part in, so later tests skip it and it is never counted twice.
+    resolve() then kills all claimed bullets in one go per store, removes
+    each hit enemy once, however many bullets reached it, and takes one hit
+    off a barricade block per enemy bullet it stopped.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.events = []
+        # Per store, the rows that can still take part in a hit this frame
+        self.usable = {}
+
+    def run(self):
+        """Collision phase of one frame, returns True when the player was hit."""
+        self.gather()
+        return self.resolve()
+
+    def free_rows(self, store):
+        window = slice(store.head, store.count)
+        return np.flatnonzero(self.usable[store][window]) + store.head
+
+    def add(self, event, store, rows, targets=None):
+        if not len(rows):
+            return
+        self.usable[store][rows] = False
+        self.events.append((event, store, rows, targets))
+
+    def gather(self):
+        game = self.game
+        bullet_manager = game.bullet_manager
+        players = bullet_manager.player_bullets
+        enemies = bullet_manager.enemy_bullets
+        bosses = bullet_manager.boss_bullets
+        self.events.clear()
+        for store in (players, enemies, bosses):
+            mask = self.usable.get(store)
+            if mask is None:
+                mask = self.usable[store] = np.zeros(store.capacity, dtype=bool)
+            np.copyto(mask, store.alive)
+
+        # Player bullets shooting down boss and enemy bullets
+        p_rows, b_rows, e_rows = bullet_manager.find_interceptions(
+            self.free_rows(players), self.free_rows(bosses), self.free_rows(enemies)
+        )
+        self.add(INTERCEPT, players, p_rows)
+        self.add(INTERCEPT, bosses, b_rows)
+        self.add(INTERCEPT, enemies, e_rows)
+
+        if game.boss_fight:
+            self.add(HIT_BOSS, players, game.boss.find_hits(self.free_rows(players)))
+        else:
+            # Barricades sit between the player and the enemies, so they are tested first
+            barricades = game.barricade_manager
+            rows, blocks = barricades.find_enemy_bullet_hits(self.usable[enemies])
+            self.add(HIT_BARRICADE, enemies, rows, blocks)
+            self.add(HIT_BARRICADE, players, barricades.find_player_bullet_hits(self.free_rows(players)))
+            rows, targets = bullet_manager.find_enemy_hits(self.free_rows(players))
+            self.add(HIT_ENEMY, players, rows, targets)
+
+        player = game.player
+        if game.boss_fight:
+            # Boss bullets pass through an invulnerable player
+            rows = bullet_manager.bullets_touching(bosses, player.mask, player.x, player.y)
+            rows = rows[self.usable[bosses][rows]]
+            if not player.invulnerable:
+                self.add(HIT_PLAYER, bosses, rows[:1])
+        else:
+            rows = bullet_manager.bullets_touching(enemies, player.mask, player.x, player.y)
+            rows = rows[self.usable[enemies][rows]]
+            if player.invulnerable:
+                self.add(SHIELDED, enemies, rows)
+            else:
+                self.add(HIT_PLAYER, enemies, rows[:1])
+
+    def resolve(self):
+        game = self.game
+        # Every claimed bullet dies here exactly once, whatever it hit
+        for store, mask in self.usable.items():
+            window = slice(store.head, store.count)
+            store.alive[window] &= mask[window]
+
+        player_hit = False
+        boss_hits = 0
+        hit_enemies = []
+        hit_blocks = []
+        for event, store, rows, targets in self.events:
+            if event == INTERCEPT and store is game.bullet_manager.boss_bullets:
+                # Virus bullets that were shot down still explode. Their positions are copied out first,
+                # a recycled spawn may reuse their rows
+                virus = rows[store.kind[rows] == KIND_VIRUS]
+                game.boss.explode_viruses(store.x[virus], store.y[virus])
+            elif event == HIT_BARRICADE and targets is not None:
+                hit_blocks.extend(targets)
+            elif event == HIT_ENEMY:
+                hit_enemies.append(targets)
+            elif event == HIT_BOSS:
+                boss_hits += len(rows)
+            elif event == HIT_PLAYER:
+                player_hit = True
+
+        if boss_hits:
+            game.boss.take_hits(boss_hits)
+        if hit_enemies:
+            game.enemy_manager.remove_enemies(np.unique(np.concatenate(hit_enemies)))
+        if hit_blocks:
+            game.barricade_manager.damage_blocks(hit_blocks)
+        if player_hit:
+            game.last_hit_time = time.time()
+            game.hit_sound.play()
+        return player_hit
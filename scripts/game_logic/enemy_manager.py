@@ -1,13 +1,19 @@
 import pygame
 import random
 import os
+from scripts.game_logic.formation import EnemyFormation
 
 class EnemyManager:
     def __init__(self, game):
-        self.enemies = []
-        self.enemy_image = self.load_and_scale_image("enemy.png", (40, 40))
+        self.base_enemy_image = self.load_and_scale_image("enemy.png", (40, 40))
+        self.enemy_image = self.base_enemy_image
+        self.formation = None
+        # The formation moves as one block, so it is drawn from one cached surface
+        self.formation_surface = None
         self.enemy_speed = 2
-        self.shoot_prob = 0.003
+        self.shoot_prob = 0.003  # Shots per enemy per frame, the formation's fire rate scales with its size
+        # Fire schedule, in units of expected shots: a shot is due when this runs out
+        self.fire_countdown = random.expovariate(1.0)
         self.direction = 1
         self.game = game
         self.create_enemies()
@@ -21,52 +27,133 @@ class EnemyManager:
             quit()
 
     def create_enemies(self):
-        self.enemies = []
-        for row in range(5):
-            for col in range(10):
-                enemy_x = col * (self.enemy_image.get_width() + 10) + 50
-                enemy_y = row * (self.enemy_image.get_height() + 10) + 50
-                self.enemies.append([enemy_x, enemy_y])
+        self.setup_wave()
+        self.formation.fill(50, 50)
+
+    def wave_shape(self, level):
+        """(rows, columns, cell size) of a level's formation."""
+        if not self.game.endless:
+            return 5, 10, 50
+        # Endless waves keep growing, cells shrink so the formation still fits in
+        # 80% of the screen width and the top half of the screen
+        wave = level
+        rows = min(5 + 2 * (wave - 1), 40)
+        cols = min(10 + 5 * (wave - 1), 80)
+        cell = int(min(50, self.game.screen_width * 0.8 / cols, self.game.screen_height * 0.5 / rows))
+        return rows, cols, cell
+
+    def build_wave(self, level):
+        """(empty formation, enemy sprite) sized for a level, only creates new objects."""
+        rows, cols, cell = self.wave_shape(level)
+        size = cell * 4 // 5  # 40 px enemies on 50 px cells
+        image = self.base_enemy_image
+        if size != image.get_width():
+            image = pygame.transform.scale(image, (size, size))
+        formation = EnemyFormation(rows=rows, cols=cols, spacing_x=cell, spacing_y=cell,
+                                   enemy_width=size, enemy_height=size)
+        return formation, image
+
+    def setup_wave(self):
+        """Size the formation grid and the enemy sprite for the current level, the grid starts empty."""
+        self.use_wave(*self.build_wave(self.game.level))
+
+    def use_wave(self, formation, image, surface=None):
+        self.formation = formation
+        self.enemy_image = image
+        self.formation_surface = surface
+        formation.dirty = surface is None
 
     def update(self):
-        if not self.enemies:
+        formation = self.formation
+        if not formation:
             if self.game.paused:  
                 return  
+            # The next stage was built in the background, swapping it in takes one frame
+            self.game.advance_stage()
+            formation = self.formation
+        elif len(formation) <= max(5, formation.alive.size // 10):
+            # Nearly cleared, start building the next stage
+            self.game.stage_loader.prepare(*self.game.next_stage())
+
+        # The whole formation moves together, only its offset changes
+        formation.x += self.enemy_speed * self.direction
+        if not formation:
+            return
+        # The formation's edges are tracked as enemies die, no need to look at each enemy
+        edge_reached = formation.left <= 0 or formation.right >= self.game.screen_width
+
+        self.fire()
 
-            if self.game.level < self.game.total_levels:
-                self.game.level += 1
-                self.game.level_up_sound.play()
-                self.game.display_feedback(f"Level {self.game.level - 1} Complete!", self.game.GREEN)
-                self.increase_difficulty()
-                self.game.clear_level()
-                self.create_enemies()
-            else:
-                self.game.boss_fight_splash_screen()
-                self.game.boss_fight = True
-
-        edge_reached = False
-        for enemy in self.enemies:
-            enemy[0] += self.enemy_speed * self.direction
-            if enemy[0] <= 0 or enemy[0] + 40 >= self.game.screen_width:
-                edge_reached = True
-
-            if random.random() < self.shoot_prob:
-                self.game.bullet_manager.add_enemy_bullet(enemy[0] + 20, enemy[1] + 40)
-
-            if enemy[1] + 40 >= self.game.screen_height:
-                self.game.game_over = True
-                self.game.game_over_screen()
+        if formation.bottom >= self.game.screen_height:
+            self.game.game_over = True
+            self.game.game_over_screen()
 
         if edge_reached:
-            for enemy in self.enemies:
-                enemy[1] += 20
+            formation.y += 20
             self.direction *= -1
 
+    def fire(self):
+        """Fire the formation's scheduled shots for this frame from front-line enemies.
+
+        The formation fires shoot_prob * enemies shots per frame on average, the
+        same total as every enemy rolling each frame. The gaps between shots are
+        exponentially distributed, so one random draw per shot replaces one per
+        enemy per frame.
+        """
+        formation = self.formation
+        self.fire_countdown -= self.shoot_prob * len(formation)
+        while self.fire_countdown <= 0:
+            self.fire_countdown += random.expovariate(1.0)
+            col = formation.front_cols[random.randrange(formation.front_cols.size)]
+            self.game.bullet_manager.add_enemy_bullet(*formation.muzzle(col))
+
+    def remove_enemies(self, cells):
+        formation = self.formation
+        killed = formation.kill_cells(cells)
+        if self.formation_surface is None or formation.dirty:
+            return
+        # Cut the dead enemies out of the cached surface, redrawing a big wave for every kill would be too slow
+        for cell in killed.tolist():
+            row, col = divmod(cell, formation.cols)
+            self.formation_surface.fill((0, 0, 0, 0), (col * formation.spacing_x, row * formation.spacing_y,
+                                                       formation.enemy_width, formation.enemy_height))
+
     def draw(self):
-        for enemy in self.enemies:
-            self.game.screen.blit(self.enemy_image, (enemy[0], enemy[1]))
+        formation = self.formation
+        if formation.dirty or self.formation_surface is None:
+            self.formation_surface = self.render_formation()
+            formation.dirty = False
+        self.game.screen.blit(self.formation_surface, (formation.x, formation.y))
+
+    def render_formation(self, formation=None, image=None):
+        if formation is None:
+            formation = self.formation
+        if image is None:
+            image = self.enemy_image
+        surface = pygame.Surface((formation.width, formation.height), pygame.SRCALPHA)
+        xs, ys = formation.positions()
+        # Positions relative to the formation's offset, which is where the surface is blitted
+        cells = zip((xs - formation.x).tolist(), (ys - formation.y).tolist())
+        # Enemies never overlap, so the sprite is copied as-is rather than blended onto the transparent surface
+        surface.blits([(image, cell, None, pygame.BLEND_RGBA_MAX) for cell in cells], doreturn=False)
+        return surface
 
     def increase_difficulty(self):
+        if self.game.endless:
+            self.set_wave_difficulty()
+            return
         self.enemy_speed += 0.5
         self.shoot_prob += 0.001
 
+    def set_wave_difficulty(self):
+        """Speed and fire rate for the current level, endless waves also get faster and fire more."""
+        wave = self.game.level
+        if not self.game.endless:
+            self.enemy_speed = 2 + 0.5 * (wave - 1)
+            self.shoot_prob = 0.003 + 0.001 * (wave - 1)
+            return
+        self.enemy_speed = min(2 + 0.25 * (wave - 1), 6)
+        # The rate is set for the whole formation, otherwise it would grow with every enemy added to a wave
+        rows, cols, _ = self.wave_shape(wave)
+        self.shoot_prob = 0.15 * (1 + 0.2 * (wave - 1)) / (rows * cols)
+
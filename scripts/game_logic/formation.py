@@ -0,0 +1,163 @@
+import numpy as np
+from scripts.game_logic.collision import grid_first_entry
+
+
+
+class EnemyFormation:
+    """Enemies on a fixed grid that moves as one.
+
+    alive[row, col] says which cells still hold an enemy and (x, y) is the
+    shared offset of cell (0, 0), so an enemy's position is
+    (x + col * spacing_x, y + row * spacing_y). A point maps to its cell with
+    integer arithmetic instead of a search over every enemy.
+
+    Alive counts per column and per row are kept up to date as enemies die,
+    so the leftmost and rightmost columns and the lowest row, and with them
+    the formation's edges, are known without a scan. front_row[col] is the
+    lowest living enemy of each column (-1 when empty), the only one allowed
+    to shoot, and front_cols lists the columns that still have one. Both
+    are only refreshed for the columns where an enemy died.
+
+    dirty is set when the grid is refilled or rebuilt, whoever caches a
+    picture of the formation clears it after redrawing. kill_cells() returns
+    the cells it emptied so such a picture can erase them instead.
+    """
+
+    def __init__(self, rows=5, cols=10, spacing_x=50, spacing_y=50, enemy_width=40, enemy_height=40):
+        self.spacing_x = spacing_x
+        self.spacing_y = spacing_y
+        self.enemy_width = enemy_width
+        self.enemy_height = enemy_height
+        self.x = 0.0
+        self.y = 0.0
+        self.resize(rows, cols)
+
+    def resize(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.alive = np.zeros((rows, cols), dtype=bool)
+        self._recount()
+
+    def _recount(self):
+        self.dirty = True
+        self.col_counts = np.count_nonzero(self.alive, axis=0)
+        self.row_counts = np.count_nonzero(self.alive, axis=1)
+        self.count = int(self.col_counts.sum())
+        self.front_row = np.full(self.cols, -1, dtype=np.intp)
+        self._update_front(np.arange(self.cols))
+        self._update_bounds()
+
+    def _update_front(self, cols):
+        # Lowest living row of each given column, found from the bottom of the column
+        alive = self.alive[::-1, cols]
+        lowest = self.rows - 1 - alive.argmax(axis=0)
+        self.front_row[cols] = np.where(alive.any(axis=0), lowest, -1)
+        self.front_cols = np.flatnonzero(self.col_counts)
+
+    def _update_bounds(self):
+        # Only runs when an edge column or the lowest row has just emptied
+        cols = np.flatnonzero(self.col_counts)
+        rows = np.flatnonzero(self.row_counts)
+        self.first_col, self.last_col = (int(cols[0]), int(cols[-1])) if cols.size else (0, -1)
+        self.last_row = int(rows[-1]) if rows.size else -1
+
+    @property
+    def left(self):
+        """x of the leftmost living enemy's left side."""
+        return self.x + self.first_col * self.spacing_x
+
+    @property
+    def right(self):
+        """x of the rightmost living enemy's right side."""
+        return self.x + self.last_col * self.spacing_x + self.enemy_width
+
+    @property
+    def bottom(self):
+        """y of the lowest living enemy's bottom side."""
+        return self.y + self.last_row * self.spacing_y + self.enemy_height
+
+    def __len__(self):
+        return self.count
+
+    def fill(self, x, y):
+        """Every cell holds an enemy, with cell (0, 0) at (x, y)."""
+        self.x = x
+        self.y = y
+        self.alive.fill(True)
+        self._recount()
+
+    def clear(self):
+        self.alive.fill(False)
+        self._recount()
+
+    def positions(self):
+        """(x, y) arrays of the living enemies' top-left corners, in row-major order."""
+        rows, cols = np.nonzero(self.alive)
+        return self.x + cols * self.spacing_x, self.y + rows * self.spacing_y
+
+    def kill_cells(self, cells):
+        """Remove enemies by flat cell index (row * cols + col), returns the cells that held one."""
+        flat = self.alive.reshape(-1)
+        cells = np.unique(np.asarray(cells, dtype=np.intp))
+        cells = cells[flat[cells]]
+        if not cells.size:
+            return cells
+        flat[cells] = False
+        rows, cols = np.divmod(cells, self.cols)
+        np.subtract.at(self.row_counts, rows, 1)
+        np.subtract.at(self.col_counts, cols, 1)
+        self.count -= cells.size
+        self._update_front(np.unique(cols))
+        if (not self.col_counts[self.first_col] or not self.col_counts[self.last_col]
+                or not self.row_counts[self.last_row]):
+            self._update_bounds()
+        return cells
+
+    def muzzle(self, col):
+        """Where the front-line enemy of a column fires from, the middle of its bottom side."""
+        return (self.x + col * self.spacing_x + self.enemy_width / 2,
+                self.y + self.front_row[col] * self.spacing_y + self.enemy_height)
+
+    @property
+    def width(self):
+        return (self.cols - 1) * self.spacing_x + self.enemy_width
+
+    @property
+    def height(self):
+        return (self.rows - 1) * self.spacing_y + self.enemy_height
+
+    def find_hits(self, x0, y0, x1, y1):
+        """(segment index, flat cell) for the first enemy each segment enters.
+
+        Every enemy takes at most one segment. The lookup only visits the
+        cells under each segment (see grid_first_entry), so its cost does not
+        grow with the number of enemies.
+        """
+        empty = np.empty(0, dtype=np.intp)
+        if not self.count or not len(x0):
+            return empty, empty
+        _, cells = grid_first_entry(x0, y0, x1, y1, self.alive, self.x, self.y, self.spacing_x, self.spacing_y,
+                                    self.enemy_width, self.enemy_height)
+        segments = np.flatnonzero(cells >= 0)
+        cells, taken = np.unique(cells[segments], return_index=True)
+        return segments[taken], cells
+
+    def to_list(self):
+        """The living enemies as [x, y] pairs, the format used by save files."""
+        xs, ys = self.positions()
+        return [[x, y] for x, y in zip(xs.tolist(), ys.tolist())]
+
+    def from_list(self, positions):
+        """Rebuild the grid from [x, y] pairs written by to_list()."""
+        if not positions:
+            self.clear()
+            return
+        xs, ys = np.array(positions, dtype=np.float64).T
+        # The pairs all share the grid's offset, the top-left one anchors it
+        self.x = float(xs.min())
+        self.y = float(ys.min())
+        cols = np.rint((xs - self.x) / self.spacing_x).astype(np.intp)
+        rows = np.rint((ys - self.y) / self.spacing_y).astype(np.intp)
+        self.resize(max(self.rows, int(rows.max()) + 1), max(self.cols, int(cols.max()) + 1))
+        self.alive[rows, cols] = True
+        self._recount()
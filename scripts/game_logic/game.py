@@ -1,6 +1,5 @@
 import pygame
 import platform
-import random
 import time
 import os
 import json
@@ -13,9 +12,12 @@ from scripts.game_logic.player import Player
 from scripts.game_logic.boss import Boss
 from scripts.game_logic.enemy_manager import EnemyManager
 from scripts.game_logic.bullet_manager import BulletManager
+from scripts.game_logic.bullet_store import KIND_BOSS, DROP
+from scripts.game_logic.collision_phase import CollisionPhase
 from scripts.game_logic.powerup_manager import PowerUpManager
-from scripts.game_logic.minigame import HackingMiniGame
 from scripts.game_logic.barricade_manager import BarricadeManager
+from scripts.game_logic.stage_loader import StageLoader
+from scripts.game_logic.question_bank import QuestionBank
 
 def get_asset_path(*path_parts):
     return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", *path_parts))
@@ -31,9 +33,12 @@ class Game:
         self.level = 1
         self.total_levels = 4
         self.boss_fight = False
+        self.endless = False  # Endless mode: waves keep growing and the boss never comes
+        self.show_fps = False  # F3 toggles the FPS readout, always shown in endless mode
         self.question_limit = 3
         self.questions_asked = 0
-        self.asked_questions = []
+        # Cybersecurity questions, read from disk the first time one is asked
+        self.question_bank = QuestionBank(get_asset_path("assets", "questions", "questions.json"))
         self.barricade_manager = BarricadeManager(self)
         self.last_hit_time = 0
         self.hit_duration = 1.5
@@ -113,33 +118,12 @@ class Game:
         self.boss = Boss(self)
         self.enemy_manager = EnemyManager(self)
         self.bullet_manager = BulletManager(self)
+        self.collision_phase = CollisionPhase(self)
         self.power_ups = PowerUpManager(self)
-        
-        # Cybersecurity questions
-        self.cybersecurity_questions = [
-            {"question": "What does 'HTTPS' stand for?",
-             "options": ["A) Hypertext Transfer Protocol Standard", "B) Hypertext Transfer Protocol Secure", "C) High Transfer Protocol Secure"],
-             "answer": "B"},
-
-            {"question": "What is a common form of phishing attack?",
-             "options": ["A) Email", "B) Phone call", "C) USB stick"],
-             "answer": "A"},
-
-            {"question": "Which type of malware locks your files and demands payment?",
-             "options": ["A) Virus", "B) Worm", "C) Ransomware"],
-             "answer": "C"},
-
-            {"question": "What is a strong password?",
-             "options": ["A) Your birthdate", "B) A combination of letters, numbers, and symbols", "C) Your pet's name"],
-             "answer": "B"},
-
-            {"question": "What does '2FA' stand for?",
-             "options": ["A) Two-Factor Authentication", "B) Two-Factor Access", "C) Two-Factor Allowance"],
-             "answer": "A"}
-        ]
+        self.stage_loader = StageLoader(self)
+        self.banner = None  # (text surface, expiry time) of the message shown over the game
+        self.banner_duration = 2
 
-        
- 
         # Sounds
         self.load_sounds()
         
@@ -269,15 +253,18 @@ class Game:
         self.display_thread.daemon = True
         self.display_thread.start()
     
-    def change_music(self, new_track):
-        """Stops current music and plays a new track safely."""
-        if not os.path.exists(new_track):  
+    def change_music(self, new_track, data=None):
+        """Stops current music and plays a new track safely, data is the track already read into memory."""
+        if data is None and not os.path.exists(new_track):  
             print(f"Music file not found: {new_track}")  # Debugging info
             return  
 
         if self.current_music != new_track:  # Avoid restarting the same track
             pygame.mixer.music.stop()
-            pygame.mixer.music.load(new_track)
+            if data is not None:
+                pygame.mixer.music.load(data, os.path.splitext(new_track)[1].lstrip("."))
+            else:
+                pygame.mixer.music.load(new_track)
             pygame.mixer.music.play(-1)  
             self.current_music = new_track  
 
@@ -342,7 +329,6 @@ class Game:
     def main_game_loop(self):
         self.change_music(self.level_music)  # Start level music
         self.start_time = time.time()
-        minigamecompleted = False
         last_score_update_time = self.start_time
         score_paused = False
         while not self.game_over:
@@ -354,6 +340,8 @@ class Game:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.paused = not self.paused  
+                    elif event.key == pygame.K_F3:
+                        self.show_fps = not self.show_fps
                 if event.type == pygame.USEREVENT + 1:
                     if hasattr(self, 'score_adjustment') and time.time() - self.score_adjustment_time >= 2:
                         del self.score_adjustment
@@ -378,46 +366,27 @@ class Game:
             if self.boss_fight:
                 self.change_music(self.boss_music)  # Start boss music
                 self.boss.update()
-                if minigamecompleted == False:
-                    self.check_minigame_trigger()
-                if self.boss_fight:
-                    player_hit = self.bullet_manager.check_player_hit_by_boss_bullet()
-                else:
-                    player_hit = self.bullet_manager.check_player_hit()
-                if player_hit:
-                    score_paused = True
-                    if not self.ask_cybersecurity_question():
-                        self.player.lives -= 1
-                        self.adjust_score(-250)
-                        score_paused = False
-                        if self.player.lives == 0:
-                            self.game_over_screen()
-                    else:
-                        score_paused = False
-
             else:
-                self.barricade_manager.update() 
                 self.barricade_manager.draw()
                 self.enemy_manager.update()
                 self.enemy_manager.draw()
-                player_hit = self.bullet_manager.check_player_hit()
                 self.power_ups.update()
-                if player_hit:
-                    score_paused = True
-                    self.hit_sound.play()
-                    if not self.ask_cybersecurity_question():
-                        self.player.lives -= 1
-                        self.adjust_score(-250)
-                        score_paused = False
-                        if self.player.lives == 0:
-                            self.game_over_screen()
-                            score_paused = False
-                    else:
-                        score_paused = False
+            # Move everything first, then find and apply every hit of the frame in one pass
+            self.bullet_manager.update()
+            player_hit = self.collision_phase.run()
+            self.bullet_manager.remove_dead()
+            if player_hit:
+                score_paused = True
+                if not self.ask_cybersecurity_question():
+                    self.player.lives -= 1
+                    self.adjust_score(-250)
+                    score_paused = False
+                    if self.player.lives == 0:
+                        self.game_over_screen()
+                else:
+                    score_paused = False
             self.player.draw()
-            self.bullet_manager.update_player_bullets()
-            self.bullet_manager.update_enemy_bullets()
-            self.bullet_manager.update_boss_bullets()
+            self.bullet_manager.draw()
             self.draw_ui()
             # Handle 7-segment display
             if self.is_raspberry_pi:
@@ -428,15 +397,6 @@ class Game:
             pygame.display.update()
             self.clock.tick(60)
 
-    def check_minigame_trigger(self):
-        if self.boss.health <= (self.boss.max_health // 2) and not self.boss.minigame_triggered:
-            success = HackingMiniGame(self).run()
-            if not success:
-                self.boss.rage_mode = True
-                self.display_feedback("BOSS ENRAGED!", self.RED)
-            else:
-                self.display_feedback("Firewall Breached!", self.GREEN)
-
     def draw_pause_menu(self):
         menu_options = ["Resume", "Save Game", "Return to Menu"]
 
@@ -454,12 +414,9 @@ class Game:
             else:
                 self.enemy_manager.draw()
 
-            # Draw player, enemies, bullets, and power-ups
+            # Draw player, bullets, and power-ups
             self.player.draw()
-            self.enemy_manager.draw()
-            self.bullet_manager.update_player_bullets(draw_only=True)
-            self.bullet_manager.update_enemy_bullets(draw_only=True)
-            self.bullet_manager.update_boss_bullets(draw_only=True)
+            self.bullet_manager.draw()
 
              # Manually draw power-ups without updating them 
             for power_up in self.power_ups.power_ups:
@@ -578,7 +535,7 @@ class Game:
         score_text = self.font.render(f"Score: {self.score}", True, self.WHITE)
         self.screen.blit(score_text, (10, 40))
 
-        level_text = self.font.render(f"Level: ", True, self.WHITE)
+        level_text = self.font.render("Wave: " if self.endless else "Level: ", True, self.WHITE)
         boss_text = self.font.render("BOSS" if self.boss_fight else str(self.level), True, self.RED if self.boss_fight else self.WHITE)
         self.screen.blit(level_text, (self.screen_width - level_text.get_width() - boss_text.get_width() - 10, 10))
         self.screen.blit(boss_text, (self.screen_width - boss_text.get_width() - 10, 10))
@@ -602,6 +559,20 @@ class Game:
             power_up_name = self.font.render(self.power_ups.current_power_up.capitalize(), True, color)
             self.screen.blit(power_up_name, (self.screen_width // 2 - power_up_name.get_width() // 2, 40))
     
+        self.draw_banner()
+
+        if self.show_fps or self.endless:
+            fps_text = self.font.render(
+                f"FPS: {self.clock.get_fps():.0f}  Enemies: {len(self.enemy_manager.formation)}", True, self.YELLOW)
+            self.screen.blit(fps_text, (10, 70))
+            # Live bullets against each store's budget, and the spawns the budget dropped or recycled
+            for i, (name, counters) in enumerate(self.bullet_manager.budget_counters().items(), 1):
+                capped = "dropped" if counters["policy"] == DROP else "recycled"
+                budget_text = self.font.render(
+                    f"{name.capitalize()} bullets: {counters['live']}/{counters['budget']}  "
+                    f"{capped}: {counters['cap_hits']}", True, self.YELLOW)
+                self.screen.blit(budget_text, (10, 70 + i * self.font.get_linesize()))
+
         if hasattr(self, 'score_adjustment'):
             adjust_text = self.font.render(self.score_adjustment, True, self.RED if self.score_adjustment[0] == '-' else self.GREEN)
             self.screen.blit(adjust_text, (score_text.get_width() + 20, 40))
@@ -623,17 +594,14 @@ class Game:
 
     def ask_cybersecurity_question(self):
         # Ensure there are available questions
-        if self.questions_asked >= self.question_limit or not self.cybersecurity_questions:
+        if self.questions_asked >= self.question_limit or not self.question_bank:
             return False
 
         self.questions_asked += 1
-        available_questions = [q for q in self.cybersecurity_questions if q not in self.asked_questions]
-        if not available_questions:
-            return False
-
         # Select a question
-        question_data = random.choice(available_questions)
-        self.asked_questions.append(question_data)
+        question_data = self.question_bank.draw()
+        if question_data is None:
+            return False
 
         question = question_data["question"]
         options = question_data["options"]
@@ -705,35 +673,73 @@ class Game:
         self.screen.blit(feedback_text, (self.screen_width // 2 - feedback_text.get_width() // 2, self.screen_height // 2 - feedback_text.get_height() // 2))
         pygame.display.flip()
 
-        if self.is_raspberry_pi:
-            if color == self.GREEN:
-                GPIO.output(GREEN_LED_PIN, GPIO.HIGH)
-                GPIO.output(RED_LED_PIN, GPIO.LOW)
-            else:
-                GPIO.output(RED_LED_PIN, GPIO.HIGH)
-                GPIO.output(GREEN_LED_PIN, GPIO.LOW)
-
+        self.set_feedback_leds(color)
         pygame.time.wait(2000)
+        self.set_feedback_leds(None)
 
-        if self.is_raspberry_pi:
+    def set_feedback_leds(self, color):
+        """Green or red LED for a feedback message, both off for None."""
+        if not self.is_raspberry_pi:
+            return
+        if color is None:
             GPIO.output(GREEN_LED_PIN, GPIO.LOW)
             GPIO.output(RED_LED_PIN, GPIO.LOW)
+        elif color == self.GREEN:
+            GPIO.output(GREEN_LED_PIN, GPIO.HIGH)
+            GPIO.output(RED_LED_PIN, GPIO.LOW)
+        else:
+            GPIO.output(RED_LED_PIN, GPIO.HIGH)
+            GPIO.output(GREEN_LED_PIN, GPIO.LOW)
 
-    def boss_fight_splash_screen(self):
+    def show_banner(self, message, color):
+        """Like display_feedback, but drawn over the running game instead of stopping it."""
+        self.banner = (self.bold_font.render(message, True, color), time.time() + self.banner_duration)
+        self.set_feedback_leds(color)
+
+    def draw_banner(self):
+        if self.banner is None:
+            return
+        text, expires = self.banner
+        if time.time() >= expires:
+            self.banner = None
+            self.set_feedback_leds(None)
+            return
+        self.screen.blit(text, (self.screen_width // 2 - text.get_width() // 2,
+                                self.screen_height // 2 - text.get_height() // 2))
+
+    def next_stage(self):
+        """(level, boss_fight) of the stage that follows the current level."""
+        if self.endless or self.level < self.total_levels:
+            return self.level + 1, False
+        return self.level, True
+
+    def advance_stage(self):
+        """Swap in the next stage, prepared in the background by the stage loader."""
+        level, boss_fight = self.next_stage()
+        stage = self.stage_loader.take(level, boss_fight)
+        if stage.music:
+            self.change_music(*stage.music)
+        if boss_fight:
+            self.start_boss_fight()
+            return
+        self.level = level
+        self.level_up_sound.play()
+        self.show_banner(f"{'Wave' if self.endless else 'Level'} {level - 1} Complete!", self.GREEN)
+        self.enemy_manager.increase_difficulty()
+        self.enemy_manager.use_wave(stage.formation, stage.enemy_image, stage.formation_surface)
+        self.clear_level(stage.barricades)
+
+    def start_boss_fight(self):
         self.change_music(self.boss_music)  # Start boss music
         self.clear_bullets()
         self.power_ups.reset_power_up()
         self.boss.health = self.boss.max_health
         self.boss.reset_boss()
         self.boss.minigame_triggered = False
-        
-        self.screen.fill(self.BLACK)
-        boss_fight_text = self.bold_font.render("Boss Fight!", True, self.RED)
-        self.screen.blit(boss_fight_text, (self.screen_width // 2 - boss_fight_text.get_width() // 2, self.screen_height // 2 - 100))
-        continue_text = self.big_font.render("Press any key to continue", True, self.WHITE)
-        self.screen.blit(continue_text, (self.screen_width // 2 - continue_text.get_width() // 2, self.screen_height // 2 + 50))
-        pygame.display.flip()
-        self.wait_for_keypress()
+        self.boss_fight = True
+        self.show_banner("Boss Fight!", self.RED)
+        # The boss holds its fire while the banner is up
+        self.boss.last_shot_time = time.time() + self.banner_duration
 
     def game_over_screen(self):
         self.change_music(self.game_over_music)  # Play Game Over music
@@ -769,7 +775,7 @@ class Game:
             pygame.time.wait(10)  
 
     def show_menu(self):
-        menu_options = ["New Game", "Load Game", "Leaderboard", "Instructions", "Exit"]
+        menu_options = ["New Game", "Endless Mode", "Load Game", "Leaderboard", "Instructions", "Exit"]
         selected_option = 0
         self.loaded_from_menu = False   
 
@@ -788,9 +794,10 @@ class Game:
             # Title text
             self.screen.blit(self.title_image, (self.screen_width // 2 - self.title_image.get_width() // 2, 50))
 
-            # Draw menu items
+            # Draw menu items, spaced to fit between the title and the bottom of the screen
+            spacing = min(80, (self.screen_height - 240) // len(menu_options))
             for i, option in enumerate(menu_options):
-                y = 200 + i * 80
+                y = 200 + i * spacing
                 color = self.GREEN if i == selected_option else self.WHITE
                 option_text = self.big_font.render(option, True, color)
                 self.screen.blit(option_text, (self.screen_width//2 - option_text.get_width()//2, y))
@@ -807,6 +814,11 @@ class Game:
                         if menu_options[selected_option] == "Load Game":
                             self.show_load_menu()
                         elif menu_options[selected_option] == "New Game":
+                            self.endless = False
+                            self.reset_game()
+                            return
+                        elif menu_options[selected_option] == "Endless Mode":
+                            self.endless = True
                             self.reset_game()
                             return
                         elif menu_options[selected_option] == "Leaderboard":
@@ -882,21 +894,6 @@ class Game:
         
             pygame.display.flip()
 
-    def draw(self, screen):
-        for block in self.blocks:
-            # You can change color based on health if desired
-            pygame.draw.rect(screen, (0, 255, 0), block["rect"])
-
-    def hit(self, pos):
-        # pos is a tuple (x, y)
-        for block in self.blocks:
-            if block["rect"].collidepoint(pos):
-                block["health"] -= 1
-                if block["health"] <= 0:
-                    self.blocks.remove(block)
-                return True
-        return False
-            
     def confirm_delete_save(self):
         # Confirmation screen
         self.screen.fill(self.BLACK)
@@ -931,15 +928,13 @@ class Game:
             'name': name,
             'level': "BOSS" if self.boss_fight else self.level,
             'boss_fight': self.boss_fight,
+            'endless': self.endless,
             'minigame_trigger': self.boss.minigame_triggered,
             'boss_ragemode': self.boss.rage_mode,
             'score': self.score,
             'questions_asked': self.questions_asked,
-            'asked_questions': self.asked_questions,
-            'player_barricades': [
-                [{'x': block['rect'].x, 'y': block['rect'].y} for block in barricade]
-                for barricade in self.barricade_manager.barricades
-            ],
+            'asked_questions': self.question_bank.asked,
+            'player_barricades': self.barricade_manager.save_state(),
 
             'player': {
                 'lives': self.player.lives,
@@ -948,14 +943,14 @@ class Game:
                 'invulnerable': self.player.invulnerable,
                 'invulnerable_time': time.time() - self.player.invulnerable_timer,
             },
-            'enemies': self.enemy_manager.enemies,
+            'enemies': self.enemy_manager.formation.to_list(),
             'enemy_direction': self.enemy_manager.direction,
             'enemy_speed': self.enemy_manager.enemy_speed,
             'enemy_shotprob': self.enemy_manager.shoot_prob,
             'boss_health': self.boss.health if self.boss_fight else None,
-            'player_bullets': [(b[0], b[1], b[2], b[3]) for b in self.bullet_manager.player_bullets],
-            'enemy_bullets': [(b[0], b[1]) for b in self.bullet_manager.enemy_bullets],
-            'boss_bullets': [(b[0], b[1], b[2], b[3]) for b in self.bullet_manager.boss_bullets],
+            'player_bullets': self.bullet_manager.player_bullets.rows("x", "y", "length", "angle"),
+            'enemy_bullets': self.bullet_manager.enemy_bullets.rows("x", "y"),
+            'boss_bullets': self.bullet_manager.boss_bullets.rows("x", "y", "dx", "dy", kind=KIND_BOSS),
             'power_ups': {
                 'active': self.power_ups.power_up_active,
                 'type': self.power_ups.current_power_up,
@@ -1046,11 +1041,12 @@ class Game:
         # Restore core state
         self.level = save_data['level']
         self.boss_fight = save_data['boss_fight']
+        self.endless = save_data.get('endless', False)
         self.boss.minigame_triggered =  save_data['minigame_trigger']
         self.boss.rage_mode = save_data['boss_ragemode']
         self.score = save_data['score']
         self.questions_asked = save_data['questions_asked']
-        self.asked_questions = save_data['asked_questions']
+        self.question_bank.restore(save_data['asked_questions'])
         self.barricade_manager.create_barricades(saved_state=save_data.get('player_barricades', None))
 
         # Restore player
@@ -1060,8 +1056,9 @@ class Game:
         self.player.invulnerable = save_data['player']['invulnerable']
         self.player.invulnerable_timer = time.time() - save_data['player']['invulnerable_time']
 
-        # Restore enemies exactly as saved
-        self.enemy_manager.enemies = save_data['enemies'] if save_data['enemies'] else []
+        # Restore enemies exactly as saved, on a grid sized for the saved level
+        self.enemy_manager.setup_wave()
+        self.enemy_manager.formation.from_list(save_data['enemies'])
         self.enemy_manager.direction = save_data['enemy_direction']
         self.enemy_manager.enemy_speed = save_data['enemy_speed']
         self.enemy_manager.shoot_prob = save_data['enemy_shotprob']
@@ -1069,17 +1066,17 @@ class Game:
         # Restore boss
         if self.boss_fight:
             self.boss.health = save_data['boss_health']
-            self.enemy_manager.enemies.clear() # Fixed issue when loading from save where enemies would spawn
+            self.enemy_manager.formation.clear() # Fixed issue when loading from save where enemies would spawn
             
 
         # Restore bullets
-        self.bullet_manager.player_bullets = [[b[0], b[1], b[2], b[3]] for b in save_data['player_bullets']]
-        self.bullet_manager.enemy_bullets = [[b[0], b[1]] for b in save_data['enemy_bullets']]
-        self.bullet_manager.boss_bullets = [
-            [b[0], b[1], b[2], b[3]] 
-            for b in save_data['boss_bullets']
-            if len(b) == 4 and all(isinstance(v, (int, float)) for v in b)
-        ]
+        for b in save_data['player_bullets']:
+            self.bullet_manager.spawn_player_bullet(b[0], b[1], b[3], b[2])
+        for b in save_data['enemy_bullets']:
+            self.bullet_manager.add_enemy_bullet(b[0], b[1])
+        for b in save_data['boss_bullets']:
+            if len(b) == 4:
+                self.bullet_manager.add_boss_bullet(b[0], b[1], b[2], b[3])
 
         # Restore power-ups
         power_up_data = save_data['power_ups']
@@ -1167,14 +1164,17 @@ class Game:
                     waiting = False
         self.show_menu()
                  
-    def clear_level(self):
+    def clear_level(self, barricades=None):
         
         # Clear player bullets and deactivate power-ups
         self.clear_bullets()
         self.power_ups.reset_power_up()  
         self.power_ups.spawn_time = time.time()  
         self.power_ups.spawn_power_up()
-        self.barricade_manager.reset()
+        if barricades is not None:
+            self.barricade_manager.use_barricades(*barricades)  # Built ahead of time by the stage loader
+        else:
+            self.barricade_manager.reset()
 
     def show_instructions(self):
         instructions_pages = [
@@ -1184,7 +1184,7 @@ class Game:
                     "Use LEFT/RIGHT arrow keys to move your firewall",
                     "Press SPACE to deploy security packets (shoot)",
                     "Destroy all incoming malware to progress",
-                    f"Survive through {self.total_levels} levels to reach the final boss",
+                    f"New Game: survive {self.total_levels} levels to reach the final boss",
                     "Collect power-ups to enhance your defenses"
                 ],
                 "image": "game_image.png"
@@ -1218,6 +1218,16 @@ class Game:
                     "Destroy core systems to win"
                 ],
                 "image": "boss_image.png"
+            },
+            {
+                "title": "Endless Mode",
+                "text": [
+                    "Pick Endless Mode from the main menu",
+                    "Waves keep growing, faster and firing more",
+                    "The boss never comes, survive as long as you can",
+                    "Press F3 in any mode to show FPS and bullet counts"
+                ],
+                "image": "game_image.png"
             }
         ]
 
@@ -1291,13 +1301,16 @@ class Game:
         self.boss_fight = False
         self.score = 5000
         self.questions_asked = 0
-        self.asked_questions = []
+        self.question_bank.reset()
+        self.stage_loader.cancel()
+        self.banner = None
+        self.enemy_manager.set_wave_difficulty()
         self.enemy_manager.create_enemies()
         self.boss.health = self.boss.max_health
         # Reset Bullets
-        self.bullet_manager.player_bullets = []
-        self.bullet_manager.enemy_bullets = []
-        self.bullet_manager.boss_bullets = []
+        self.bullet_manager.player_bullets.clear()
+        self.bullet_manager.enemy_bullets.clear()
+        self.bullet_manager.boss_bullets.clear()
         # Reset Power-ups
         self.power_ups.power_up_active = False
         self.power_ups.current_power_up = None
@@ -1314,8 +1327,10 @@ class Game:
         self.bullet_manager.enemy_bullets.clear()
         self.bullet_manager.boss_bullets.clear()
         self.barricade_manager.reset()
-        # Clear Enemies
-        self.enemy_manager.enemies.clear()
+        # Clear Enemies and anything prepared for the next stage
+        self.enemy_manager.formation.clear()
+        self.stage_loader.cancel()
+        self.banner = None
         # Clear Power-Ups
         self.power_ups.reset_power_up()
         self.power_ups.is_first_level = True
@@ -1325,7 +1340,7 @@ class Game:
         # Reset Score & Level
         self.level = 1
         self.questions_asked = 0
-        self.asked_questions.clear()
+        self.question_bank.reset()
         self.score = 5000
         # Reset Player
         self.player.lives = 3
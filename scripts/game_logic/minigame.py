@@ -1,5 +1,6 @@
 import pygame
 import random
+from scripts.game_logic.word_search import WordSearch, RIGHT, DOWN, DOWN_RIGHT
 
 class HackingMiniGame:
     def __init__(self, game):
@@ -8,6 +9,7 @@ class HackingMiniGame:
         self.screen_width = game.screen_width
         self.screen_height = game.screen_height
         self.grid_size = 8
+        self.directions = [RIGHT, DOWN, DOWN_RIGHT]  # The hidden word reads left to right, downwards or diagonally
         self.chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*"
         self.words = ["SECURE", "ACCESS", "SYSTEM", "DEFEND", "SHIELD"]
         self.correct_word = random.choice(self.words)
@@ -18,29 +20,21 @@ class HackingMiniGame:
         self.start_time = pygame.time.get_ticks() / 1000
         self.grid = []
         self.generate_grid()
+        self.cell_size = 40
+        self.start_x = (self.screen_width - (self.grid_size * self.cell_size)) // 2
+        self.start_y = (self.screen_height - (self.grid_size * self.cell_size)) // 2
+        # Every character is rendered once into the glyph atlas, the grid is composed from it once into
+        # the static layer, and draw() only adds what changes on top of that
+        self.glyphs, self.glyph_rects = self.build_glyph_atlas()
+        self.static_layer = self.build_static_layer()
+        # (value, rendered surface) of the changing texts, re-rendered only when the value changes
+        self.timer_text = (None, None)
+        self.input_text = (None, None, None)
 
     def generate_grid(self):
-        """Generate the grid with the correct word hidden in a random orientation."""
-        self.grid = [[random.choice(self.chars) for _ in range(self.grid_size)] 
-                     for _ in range(self.grid_size)]
-        
-        # Randomly choose orientation: 0 = horizontal, 1 = vertical, 2 = diagonal 
-        orientation = random.choice([0, 1, 2])
-        if orientation == 0:  # Horizontal
-            row = random.randint(0, self.grid_size - 1)
-            start_col = random.randint(0, self.grid_size - len(self.correct_word))
-            for i, c in enumerate(self.correct_word):
-                self.grid[row][start_col + i] = c
-        elif orientation == 1:  # Vertical
-            col = random.randint(0, self.grid_size - 1)
-            start_row = random.randint(0, self.grid_size - len(self.correct_word))
-            for i, c in enumerate(self.correct_word):
-                self.grid[start_row + i][col] = c
-        elif orientation == 2:  # Diagonal
-            start_row = random.randint(0, self.grid_size - len(self.correct_word))
-            start_col = random.randint(0, self.grid_size - len(self.correct_word))
-            for i, c in enumerate(self.correct_word):
-                self.grid[start_row + i][start_col + i] = c
+        """Generate the grid with the correct word hidden exactly once and no other word from the list in it."""
+        search = WordSearch(self.grid_size, [self.correct_word], self.chars, self.directions, forbidden=self.words)
+        self.grid = search.rows()
 
     def show_instructions(self):
         self.screen.fill(self.game.BLACK)
@@ -74,46 +68,59 @@ class HackingMiniGame:
         pygame.display.flip()
         self.game.wait_for_keypress()
 
+    def build_glyph_atlas(self):
+        """One surface holding every grid character side by side, and the area of each character in it."""
+        rendered = {char: self.game.font.render(char, True, self.game.WHITE) for char in self.chars}
+        atlas = pygame.Surface((sum(glyph.get_width() for glyph in rendered.values()),
+                                max(glyph.get_height() for glyph in rendered.values())), pygame.SRCALPHA)
+        rects = {}
+        x = 0
+        for char, glyph in rendered.items():
+            rects[char] = atlas.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        return atlas, rects
+
+    def build_static_layer(self):
+        """The parts of the screen that never change during the minigame: background, grid and target word."""
+        layer = pygame.Surface((self.screen_width, self.screen_height))
+        layer.fill(self.game.BLACK)
+        layer.blits([(self.glyphs, (self.start_x + col * self.cell_size + 10, self.start_y + row * self.cell_size + 10),
+                      self.glyph_rects[char])
+                     for row, line in enumerate(self.grid) for col, char in enumerate(line)], doreturn=False)
+        word_text = self.game.font.render(f"Target Word: {self.correct_word}", True, self.game.GREEN)
+        layer.blit(word_text, (self.screen_width//2 - word_text.get_width()//2, self.start_y - 50))
+        return layer
+
     def draw(self, remaining_time):
         """Draw all game elements"""
-        self.screen.fill(self.game.BLACK)
-        
+        self.screen.blit(self.static_layer, (0, 0))
+        cell_size = self.cell_size
+
         # Timer
-        timer_text = self.game.font.render(f"TIME: {int(remaining_time)}", True, 
-                                             self.game.RED if remaining_time < 5 else self.game.WHITE)
+        seconds = int(remaining_time)
+        if self.timer_text[0] != seconds:
+            self.timer_text = (seconds, self.game.font.render(f"TIME: {seconds}", True,
+                                                              self.game.RED if remaining_time < 5 else self.game.WHITE))
+        timer_text = self.timer_text[1]
         self.screen.blit(timer_text, (self.screen_width // 2 - timer_text.get_width() // 2, 10))
-        
-        # Grid
-        cell_size = 40
-        start_x = (self.screen_width - (self.grid_size * cell_size)) // 2
-        start_y = (self.screen_height - (self.grid_size * cell_size)) // 2
-                
 
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                x = start_x + col * cell_size
-                y = start_y + row * cell_size
-                char = self.grid[row][col]
-                
-                # Draw selection box
-                if row == self.selected_row and col == self.selected_col:
-                    pygame.draw.rect(self.screen, self.game.GREEN, (x - 2, y - 2, cell_size + 4, cell_size + 4), 3)
-                
-                # Draw character
-                text = self.game.font.render(char, True, self.game.WHITE)
-                self.screen.blit(text, (x + 10, y + 10))
-        
-        input_text = self.game.font.render("".join(self.input_buffer), True, self.game.WHITE)
-        input_rect = input_text.get_rect(center=(self.screen_width // 2, start_y + (self.grid_size * cell_size) + 50))
+        # Draw selection box
+        x = self.start_x + self.selected_col * cell_size
+        y = self.start_y + self.selected_row * cell_size
+        pygame.draw.rect(self.screen, self.game.GREEN, (x - 2, y - 2, cell_size + 4, cell_size + 4), 3)
+
+        typed = "".join(self.input_buffer)
+        if self.input_text[0] != typed:
+            # Input status – using dynamic max letters
+            status_color = self.game.RED if len(self.input_buffer) >= len(self.correct_word) else self.game.WHITE
+            self.input_text = (typed, self.game.font.render(typed, True, self.game.WHITE),
+                               self.game.font.render(f"Letters: {len(self.input_buffer)}/{len(self.correct_word)}",
+                                                     True, status_color))
+        _, input_text, status_text = self.input_text
+        input_rect = input_text.get_rect(center=(self.screen_width // 2,
+                                                 self.start_y + (self.grid_size * cell_size) + 50))
         self.screen.blit(input_text, input_rect)
-        
-        # Input status – using dynamic max letters
-        status_color = self.game.RED if len(self.input_buffer) >= len(self.correct_word) else self.game.WHITE
-        status_text = self.game.font.render(f"Letters: {len(self.input_buffer)}/{len(self.correct_word)}", True, status_color)
         self.screen.blit(status_text, (self.screen_width // 2 - 100, input_rect.bottom + 10))
-        
-        word_text = self.game.font.render(f"Target Word: {self.correct_word}", True, self.game.GREEN)
-        self.screen.blit(word_text, (self.screen_width//2 - word_text.get_width()//2, start_y - 50))
         pygame.display.flip()
 
     def show_result(self, success):
@@ -194,7 +201,6 @@ class HackingMiniGame:
             
             # Draw everything
             self.draw(remaining)
-            pygame.display.flip()
             self.game.clock.tick(60)
         
         self.show_result(success)
@@ -0,0 +1,57 @@
+import hashlib
+import os
+import numpy as np
+import pygame
+
+# Outlines already built, keyed by sprite file hash and outline parameters
+CACHE_DIR = os.path.join("cache", "outlines")
+
+
+def _dilate(mask, radius):
+    """Every pixel within radius (a square neighbourhood) of a set pixel, the grid's edges are empty."""
+    width, height = mask.shape
+    padded = np.zeros((width + 2 * radius, height + 2 * radius), dtype=bool)
+    padded[radius:radius + width, radius:radius + height] = mask
+    grown = np.zeros_like(mask)
+    for dx in range(2 * radius + 1):
+        for dy in range(2 * radius + 1):
+            grown |= padded[dx:dx + width, dy:dy + height]
+    return grown
+
+
+def build_outline(image, color, reach=2, thickness=1):
+    """A surface the size of image with the sprite's edge painted in color.
+
+    Edge pixels are the opaque pixels with a transparent one within reach,
+    the outline is those pixels grown by thickness on every side.
+    """
+    solid = pygame.surfarray.array_alpha(image) > 127  # Same threshold as pygame.mask.from_surface
+    edge = solid & _dilate(~solid, reach)
+    outline = _dilate(edge, thickness)
+    surface = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+    pixels = pygame.surfarray.pixels3d(surface)
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    pixels[outline] = color[:3]
+    alpha[outline] = color[3] if len(color) > 3 else 255
+    del pixels, alpha  # Unlock the surface
+    return surface
+
+
+def sprite_outline(image, path, color, reach=2, thickness=1):
+    """build_outline() for a sprite loaded from path, read from the disk cache when it was built before."""
+    with open(path, "rb") as f:
+        key = hashlib.sha1(f.read())
+    key.update(repr((image.get_size(), tuple(color), reach, thickness)).encode())
+    cached = os.path.join(CACHE_DIR, key.hexdigest() + ".png")
+    if os.path.exists(cached):
+        try:
+            return pygame.image.load(cached).convert_alpha()
+        except pygame.error:
+            pass  # Unreadable cache file, build it again
+    outline = build_outline(image, color, reach, thickness)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        pygame.image.save(outline, cached)
+    except (OSError, pygame.error) as e:
+        print(f"Could not cache outline '{cached}': {e}")
+    return outline
@@ -1,11 +1,14 @@
 import pygame
 import os
 import time
+from scripts.game_logic.outline import sprite_outline
 
 class Player:
     def __init__(self, game):
         self.image = self.load_and_scale_image("player.png", (50, 50))
         self.width, self.height = self.image.get_size()
+        # Bullets only hit the player's solid pixels
+        self.mask = pygame.mask.from_surface(self.image)
         self.x = (game.screen_width - self.width) // 2
         self.y = game.screen_height - self.height - 10
         self.speed = 5
@@ -25,31 +28,8 @@ class Player:
             quit()
 
     def create_shield_outline(self):
-        outline_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        player_mask = pygame.mask.from_surface(self.image)
         dark_blue = (60, 60 , 180, 255)  # Darker blue for the outline
-
-        for x in range(self.width):
-            for y in range(self.height):
-                if player_mask.get_at((x, y)):
-                    # Check if this pixel is on or near the edge of the shape
-                    for dx in range(-2, 3):  # Check 2 pixels in each direction
-                        for dy in range(-2, 3):
-                            nx, ny = x + dx, y + dy
-                            if 0 <= nx < self.width and 0 <= ny < self.height and not player_mask.get_at((nx, ny)):
-                                # Set color for a thicker outline
-                                outline_surface.set_at((x, y), dark_blue)
-                                for i in range(-1, 2):
-                                    for j in range(-1, 2):
-                                        nx2, ny2 = x + i, y + j
-                                        if 0 <= nx2 < self.width and 0 <= ny2 < self.height:
-                                            outline_surface.set_at((nx2, ny2), dark_blue)
-                                break  # Break after setting one outline pixel to prevent overwriting
-                        else:
-                            continue
-                        break
-
-        return outline_surface    
+        return sprite_outline(self.image, os.path.join("assets", "sprites", "player.png"), dark_blue)
 
     def move(self, keys):
         if keys[pygame.K_LEFT]:
@@ -0,0 +1,100 @@
+import json
+import random
+
+
+class QuestionBank:
+    """The cybersecurity questions, read from a JSON file the first time one is needed.
+
+    The file holds {"questions": [...]}, each question a dict with an "id",
+    "topic", "difficulty", the "question" text, its "options" and the letter
+    of the right "answer". Questions are indexed by id, topic and difficulty.
+
+    Each (topic, difficulty) filter asked for gets a deck, its matching ids
+    shuffled once, and a cursor into it. Drawing moves the cursor past ids
+    already asked, so picking an unseen question costs O(1) on average
+    whatever the size of the bank.
+    """
+
+    def __init__(self, path, rng=random):
+        self.path = path
+        self.rng = rng
+        self.loaded = False
+        self.by_id = {}
+        self.by_topic = {}
+        self.by_difficulty = {}
+        self.by_text = {}  # Only used to read saves that stored whole questions
+        self.asked = []  # Ids in the order they were asked, this is what saves store
+        self.seen = set()
+        self.decks = {}  # [shuffled ids, cursor] by (topic, difficulty)
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                questions = json.load(f)["questions"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not load questions from '{self.path}': {e}")
+            return
+        for question in questions:
+            question_id = question["id"]
+            self.by_id[question_id] = question
+            self.by_topic.setdefault(question.get("topic"), []).append(question_id)
+            self.by_difficulty.setdefault(question.get("difficulty"), []).append(question_id)
+            self.by_text[question["question"]] = question_id
+
+    def __len__(self):
+        self.load()
+        return len(self.by_id)
+
+    def draw(self, topic=None, difficulty=None):
+        """A random question not asked yet, optionally of one topic and/or difficulty, or None when all were asked."""
+        self.load()
+        key = (topic, difficulty)
+        if key not in self.decks:
+            if topic is None and difficulty is None:
+                ids = list(self.by_id)
+            elif difficulty is None:
+                ids = list(self.by_topic.get(topic, []))
+            elif topic is None:
+                ids = list(self.by_difficulty.get(difficulty, []))
+            else:
+                of_difficulty = set(self.by_difficulty.get(difficulty, []))
+                ids = [question_id for question_id in self.by_topic.get(topic, []) if question_id in of_difficulty]
+            self.rng.shuffle(ids)
+            self.decks[key] = [ids, 0]
+        deck = self.decks[key]
+        ids, cursor = deck
+        # Ids asked through another deck, or before a save was loaded, are skipped once
+        while cursor < len(ids) and ids[cursor] in self.seen:
+            cursor += 1
+        if cursor == len(ids):
+            deck[1] = cursor
+            return None
+        deck[1] = cursor + 1
+        question_id = ids[cursor]
+        self.mark_asked(question_id)
+        return self.by_id[question_id]
+
+    def mark_asked(self, question_id):
+        if question_id not in self.seen:
+            self.seen.add(question_id)
+            self.asked.append(question_id)
+
+    def restore(self, asked):
+        """Mark the questions of a save as asked, older saves list whole question dicts instead of ids."""
+        self.reset()
+        for entry in asked:
+            if isinstance(entry, dict):
+                self.load()
+                entry = self.by_text.get(entry.get("question"))
+                if entry is None:
+                    continue  # A question no longer in the bank
+            self.mark_asked(entry)
+
+    def reset(self):
+        """Forget which questions were asked, the decks are shuffled again when next drawn from."""
+        self.asked = []
+        self.seen.clear()
+        self.decks.clear()
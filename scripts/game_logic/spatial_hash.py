@@ -0,0 +1,79 @@
+import numpy as np
+
+# Packs a (column, row) cell into one integer key, rows are offset so negative cells stay unique
+_ROW_STRIDE = 1 << 21
+_ROW_OFFSET = _ROW_STRIDE // 2
+
+
+class SpatialHash:
+    """Uniform grid broadphase for point-vs-point proximity tests.
+
+    build() buckets the target points once per frame, query() then only runs
+    the exact distance test against targets in the 3x3 cells around each
+    query point. The cell size must be at least the largest query radius.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.pairs_tested = 0  # Candidate pairs that reached the distance test
+        self.pairs_hit = 0     # Candidate pairs that were actually in range
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self._order = np.empty(0, dtype=np.intp)
+        self._sorted_keys = np.empty(0, dtype=np.int64)
+
+    def _cells(self, x, y):
+        return (np.floor_divide(x, self.cell_size).astype(np.int64),
+                np.floor_divide(y, self.cell_size).astype(np.int64))
+
+    def build(self, x, y):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        col, row = self._cells(self.x, self.y)
+        keys = col * _ROW_STRIDE + row + _ROW_OFFSET
+        self._order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[self._order]
+
+    def candidates(self, qx, qy):
+        """(query index, target index) pairs for every target in the neighbouring cells."""
+        qx = np.asarray(qx, dtype=np.float64)
+        qy = np.asarray(qy, dtype=np.float64)
+        if not qx.size or not self._sorted_keys.size:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        col, row = self._cells(qx, qy)
+        queries = []
+        targets = []
+        for d_col in (-1, 0, 1):
+            for d_row in (-1, 0, 1):
+                keys = (col + d_col) * _ROW_STRIDE + (row + d_row) + _ROW_OFFSET
+                lo = np.searchsorted(self._sorted_keys, keys, side="left")
+                hi = np.searchsorted(self._sorted_keys, keys, side="right")
+                counts = hi - lo
+                total = int(counts.sum())
+                if not total:
+                    continue
+                # Expand each [lo, hi) run of the sorted keys into one entry per target
+                group_start = np.cumsum(counts) - counts
+                queries.append(np.repeat(np.arange(qx.size), counts))
+                targets.append(self._order[np.repeat(lo - group_start, counts) + np.arange(total)])
+        if not queries:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        return np.concatenate(queries), np.concatenate(targets)
+
+    def query(self, qx, qy, radius):
+        """(query index, target index) pairs closer than radius."""
+        if radius > self.cell_size:
+            raise ValueError(f"Query radius {radius} is larger than the cell size {self.cell_size}")
+        qx = np.asarray(qx, dtype=np.float64)
+        qy = np.asarray(qy, dtype=np.float64)
+        query, target = self.candidates(qx, qy)
+        hit = (qx[query] - self.x[target]) ** 2 + (qy[query] - self.y[target]) ** 2 < radius ** 2
+        self.pairs_tested += query.size
+        self.pairs_hit += int(np.count_nonzero(hit))
+        return query[hit], target[hit]
+
+    def reset_counters(self):
+        self.pairs_tested = 0
+        self.pairs_hit = 0
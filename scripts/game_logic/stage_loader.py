@@ -0,0 +1,79 @@
+import io
+import os
+from threading import Thread
+
+
+class Stage:
+    """Everything the next stage needs, built before it starts."""
+
+    def __init__(self, level, boss_fight):
+        self.level = level
+        self.boss_fight = boss_fight
+        self.formation = None
+        self.enemy_image = None
+        self.formation_surface = None
+        self.barricades = None  # (block health grids, their cached surface)
+        self.music = None  # (track path, file object ready for pygame.mixer.music.load)
+        self.error = None  # The exception that stopped the background build, if one did
+
+
+class StageLoader:
+    """Builds the next stage on a background thread during the end of the current one.
+
+    The build only creates new objects and never touches the running stage,
+    so swapping it in (Game.advance_stage) is a handful of assignments.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.stage = None
+        self.thread = None
+
+    def prepare(self, level, boss_fight):
+        """Start building a stage, unless that same stage is already being built."""
+        if self.stage is not None and (self.stage.level, self.stage.boss_fight) == (level, boss_fight):
+            return
+        self.stage = Stage(level, boss_fight)
+        self.thread = Thread(target=self.build, args=(self.stage,), daemon=True)
+        self.thread.start()
+
+    def build(self, stage):
+        """Thread target, an exception is kept on the stage for take() instead of ending the thread unseen."""
+        try:
+            self.build_stage(stage)
+        except Exception as e:
+            stage.error = e
+
+    def build_stage(self, stage):
+        game = self.game
+        if not stage.boss_fight:
+            enemy_manager = game.enemy_manager
+            stage.formation, stage.enemy_image = enemy_manager.build_wave(stage.level)
+            stage.formation.fill(50, 50)
+            stage.formation_surface = enemy_manager.render_formation(stage.formation, stage.enemy_image)
+            barricade_manager = game.barricade_manager
+            health = barricade_manager.build_barricades()
+            stage.barricades = (health, barricade_manager.render_barricades(health))
+        track = game.boss_music if stage.boss_fight else game.level_music
+        # Read the track into memory now so starting it later doesn't hit the disk
+        if track != game.current_music and os.path.exists(track):
+            with open(track, "rb") as f:
+                stage.music = (track, io.BytesIO(f.read()))
+
+    def take(self, level, boss_fight):
+        """The prepared stage, waiting for it (or building it) if it isn't ready yet."""
+        self.prepare(level, boss_fight)
+        self.thread.join()
+        stage = self.stage
+        self.cancel()
+        if stage.error is not None:
+            # Build it again here, an error this time is raised to the caller
+            print(f"Background build of the next stage failed, building it now: {stage.error!r}")
+            stage = Stage(level, boss_fight)
+            self.build_stage(stage)
+        return stage
+
+    def cancel(self):
+        # A thread still running only fills in a Stage nobody refers to any more
+        self.stage = None
+        self.thread = None
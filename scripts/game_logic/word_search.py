@@ -0,0 +1,173 @@
+import random
+import numpy as np
+
+# (row step, column step) of each direction a word can read in
+RIGHT, DOWN, DOWN_RIGHT, UP_RIGHT = (0, 1), (1, 0), (1, 1), (-1, 1)
+ALL_DIRECTIONS = [RIGHT, DOWN, DOWN_RIGHT, UP_RIGHT, (0, -1), (-1, 0), (-1, -1), (1, -1)]
+
+_BITS = 6  # Bits per letter in a packed window, enough for a 63 letter alphabet
+_MAX_LENGTH = 63 // _BITS  # Longest word a window of one int64 can hold
+_PLACE_TRIES = 32  # Random windows tried for a word before searching all of them for one that fits
+_WINDOWS = {}  # lines() by (grid size, word length), shared by every grid of that size
+
+
+class WordSearchError(Exception):
+    """No grid with every word exactly once was found within the allowed attempts."""
+
+
+class WordSearch:
+    """A square letter grid with words hidden in it, each readable exactly once.
+
+    Letters are kept as codes 1..len(alphabet), 0 being an empty cell.
+    Filler letters are random, so they can spell a hidden word a second time,
+    or one of the `forbidden` words. After filling, the grid is scanned for
+    all the words at once: the letters of every window of a given length
+    along the four line directions are packed into one integer, and each
+    window is looked up among the packed words and their reversals. Filler
+    cells of any extra copy are re-rolled until every hidden word reads
+    exactly once and no forbidden word reads at all.
+
+    placements maps each hidden word to the flat cell indices of its letters.
+    """
+
+    def __init__(self, size, words, alphabet, directions=ALL_DIRECTIONS, forbidden=(), rng=random, attempts=20):
+        self.size = size
+        self.words = list(words)
+        self.alphabet = alphabet
+        self.directions = list(directions)
+        self.forbidden = [word for word in forbidden if word not in self.words]
+        self.rng = rng
+        if len(alphabet) >= 1 << _BITS:
+            raise ValueError(f"Alphabets are limited to {(1 << _BITS) - 1} letters")
+        for word in self.words + self.forbidden:
+            if len(word) > _MAX_LENGTH or set(word) - set(alphabet):
+                raise ValueError(f"{word!r} is longer than {_MAX_LENGTH} letters or not in the alphabet")
+        self.letter_codes = {letter: code for code, letter in enumerate(alphabet, 1)}
+        self.allowed_windows = {}  # Rows of lines(length) in an allowed direction, by (length, reverse)
+        for _ in range(attempts):
+            if self.generate():
+                return
+        raise WordSearchError(f"Could not hide {self.words} exactly once in a {size}x{size} grid")
+
+    def encode(self, word):
+        return np.array([self.letter_codes[letter] for letter in word], dtype=np.int64)
+
+    def pack(self, word):
+        return int((self.encode(word) << (_BITS * np.arange(len(word)))).sum())
+
+    def lines(self, length):
+        """Flat cell indices of every window of that length, as (windows, length), along the four line directions."""
+        key = (self.size, length)
+        if key not in _WINDOWS:
+            size = self.size
+            steps = np.arange(length)
+            lines = []
+            for d_row, d_col in (RIGHT, DOWN, DOWN_RIGHT, UP_RIGHT):
+                low_row = length - 1 if d_row < 0 else 0
+                high_row = size if d_row < 0 else size - (length - 1) * d_row
+                rows, cols = np.meshgrid(np.arange(low_row, high_row), np.arange(size - (length - 1) * d_col),
+                                         indexing="ij")
+                starts = (rows * size + cols).reshape(-1, 1)
+                lines.append(starts + steps * (d_row * size + d_col))
+            _WINDOWS[key] = np.concatenate(lines)
+        return _WINDOWS[key]
+
+    def generate(self):
+        """One attempt at building the grid, returns False when it has to start over."""
+        self.codes = np.zeros(self.size * self.size, dtype=np.int64)
+        self.placements = {}
+        # Longest words first, they have the fewest places to go
+        for word in sorted(self.words, key=len, reverse=True):
+            cells = self.place(word)
+            if cells is None:
+                return False
+            self.placements[word] = cells
+        hidden = self.codes > 0
+        filler = np.flatnonzero(~hidden)
+        self.codes[filler] = self.random_codes(filler.size)
+        for _ in range(100):
+            extra = self.extra_copies()
+            if not extra:
+                return True
+            cells = np.unique(np.concatenate(extra))
+            cells = cells[~hidden[cells]]
+            if not cells.size:
+                return False  # An extra copy made only of hidden words' letters, no filler to change
+            self.codes[cells] = self.random_codes(cells.size)
+        return False
+
+    def random_codes(self, count):
+        return self.rng.choices(range(1, len(self.alphabet) + 1), k=count)
+
+    def place(self, word):
+        """Write word at a random start and direction that fits, returns its cells or None if nothing fits.
+
+        Windows run along the four line directions, a word going one of the
+        other four reads a window backwards. While the grid is mostly empty a
+        few random windows almost always turn up one that fits, only when they
+        don't are all windows checked.
+        """
+        windows = self.lines(len(word))
+        letters = self.encode(word)
+        forward, backward = self.allowed(len(word), False), self.allowed(len(word), True)
+        total = forward.size + backward.size
+        for _ in range(min(_PLACE_TRIES, total)):
+            pick = self.rng.randrange(total)
+            cells = windows[forward[pick]] if pick < forward.size else windows[backward[pick - forward.size]][::-1]
+            current = self.codes[cells]
+            # A window fits when each of its cells is empty or already holds that letter
+            if ((current == 0) | (current == letters)).all():
+                self.codes[cells] = letters
+                return cells
+        options = []
+        for rows, wanted in ((forward, letters), (backward, letters[::-1])):
+            current = self.codes[windows[rows]]
+            options.append(rows[((current == 0) | (current == wanted)).all(axis=1)])
+        forward, backward = options
+        total = forward.size + backward.size
+        if not total:
+            return None
+        pick = self.rng.randrange(total)
+        cells = windows[forward[pick]] if pick < forward.size else windows[backward[pick - forward.size]][::-1]
+        self.codes[cells] = letters
+        return cells
+
+    def allowed(self, length, reverse):
+        """Rows of lines(length) whose direction, or its opposite if reverse, is one of the allowed directions."""
+        key = (length, reverse)
+        if key not in self.allowed_windows:
+            mask = []
+            for d_row, d_col in (RIGHT, DOWN, DOWN_RIGHT, UP_RIGHT):
+                count = max(0, self.size - (length - 1) * abs(d_row)) * max(0, self.size - (length - 1) * d_col)
+                direction = (-d_row, -d_col) if reverse else (d_row, d_col)
+                mask.append(np.full(count, direction in self.directions))
+            self.allowed_windows[key] = np.flatnonzero(np.concatenate(mask))
+        return self.allowed_windows[key]
+
+    def scan(self, words):
+        """Flat cells of every copy of any of words in the grid, read in any of the 8 directions."""
+        found = []
+        by_length = {}
+        for word in words:
+            by_length.setdefault(len(word), []).append(word)
+        for length, group in by_length.items():
+            windows = self.lines(length)
+            packed = (self.codes[windows] << (_BITS * np.arange(length))).sum(axis=1)
+            # A palindrome matches its reversal on the same cells, that is one copy
+            keys = {self.pack(word) for word in group} | {self.pack(word[::-1]) for word in group}
+            hits = np.flatnonzero(np.isin(packed, np.fromiter(keys, dtype=np.int64)))
+            found += [windows[hit] for hit in hits.tolist()]
+        return found
+
+    def extra_copies(self):
+        """Cells of every copy beyond the one hidden for each word, and of every copy of a forbidden word."""
+        placed = {frozenset(cells.tolist()) for cells in self.placements.values()}
+        extra = [cells for cells in self.scan(self.words) if frozenset(cells.tolist()) not in placed]
+        if self.forbidden:
+            extra += self.scan(self.forbidden)
+        return extra
+
+    def rows(self):
+        """The grid as a list of rows of characters."""
+        letters = np.array([""] + list(self.alphabet))
+        return letters[self.codes.reshape(self.size, self.size)].tolist()